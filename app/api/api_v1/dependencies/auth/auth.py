@@ -1,6 +1,8 @@
-from typing import Tuple, Optional, Union
+from typing import Any, Dict, Tuple, Optional, Union
 
+import jwt
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pydantic import UUID4
 
 from fastapi import (
     APIRouter, Depends, HTTPException, Response, status, Request)
@@ -15,7 +17,8 @@ from fastapi_users.authentication import (
     AuthenticationBackend, Authenticator, Strategy,
     BearerTransport, JWTStrategy)
 from fastapi_users.db import MongoDBUserDatabase
-from fastapi_users.manager import UserManagerDependency
+from fastapi_users.jwt import decode_jwt
+from fastapi_users.manager import UserManagerDependency, UserNotExists
 
 from app.api.api_v1.dependencies.auth.login_form import LoginForm
 from app.core.config import settings
@@ -25,6 +28,8 @@ from app.worker import arq_manager
 from app.constants.auth_errors import AuthErrors
 from app.crud.user_two_factor import (
     get_user_two_factor_state, verify_two_factor_code)
+from app.utils.hashing import hashing_executor
+from app.utils.user_cache import user_cache
 
 
 class UserManager(BaseUserManager[UserCreate, UserDB]):
@@ -36,7 +41,7 @@ class UserManager(BaseUserManager[UserCreate, UserDB]):
         self, credentials: LoginForm,
         db: AsyncIOMotorDatabase) -> \
             Tuple[Optional[models.UD], bool, bool]:
-        user = await super().authenticate(credentials)
+        user = await self.authenticate_password(credentials)
         if user:
             two_factor_state = await get_user_two_factor_state(db, user.id)
             two_factor_verified = False
@@ -46,14 +51,58 @@ class UserManager(BaseUserManager[UserCreate, UserDB]):
             return (user, two_factor_state.is_enabled, two_factor_verified)
         return (None, False, False)
 
+    async def authenticate_password(
+            self, credentials: LoginForm) -> Optional[models.UD]:
+        """
+            Same as BaseUserManager.authenticate with the hashing done in
+            the hashing executor
+        """
+        try:
+            user = await self.get_by_email(credentials.username)
+        except UserNotExists:
+            # Run the hasher to mitigate timing attack
+            await hashing_executor.run(
+                password.get_password_hash, credentials.password)
+            return None
+        verified, updated_password_hash = await hashing_executor.run(
+            password.verify_and_update_password,
+            credentials.password, user.hashed_password)
+        if not verified:
+            return None
+        if updated_password_hash is not None:
+            user.hashed_password = updated_password_hash
+            await self.user_db.update(user)
+            await user_cache.invalidate(user.id)
+        return user
+
+    async def _update(
+            self, user: models.UD, update_dict: Dict[str, Any]) -> models.UD:
+        if 'password' in update_dict:
+            update_dict = dict(update_dict)
+            new_password = update_dict.pop('password')
+            await self.validate_password(new_password, user)
+            user.hashed_password = await hashing_executor.run(
+                password.get_password_hash, new_password)
+        updated_user = await super()._update(user, update_dict)
+        await user_cache.invalidate(user.id)
+        return updated_user
+
+    async def delete(self, user: models.UD) -> None:
+        await super().delete(user)
+        await user_cache.invalidate(user.id)
+
     async def update(
             self,
             user_update: UserUpdate,
             user: UserDB,
             safe: bool = False,
             request: Optional[Request] = None) -> UserDB:
+        # The user of the request comes from the user cache without its
+        # password hash, the update writes the whole user back
+        user = await self.get(user.id)
         if user_update.password:
-            verified, _ = password.verify_and_update_password(
+            verified, _ = await hashing_executor.run(
+                password.verify_and_update_password,
                 user_update.current_password, user.hashed_password)
             if not verified:
                 raise InvalidPasswordException(
@@ -96,8 +145,30 @@ def get_user_manager(user_db=Depends(get_user_db)):
     yield UserManager(user_db)
 
 
+class CachedJWTStrategy(JWTStrategy):
+    async def read_token(
+            self, token: Optional[str],
+            user_manager: BaseUserManager[models.UC, models.UD]) -> \
+            Optional[models.UD]:
+        """
+            The token is still decoded and checked on every request, only
+            the user lookup is served from the user cache
+        """
+        if token is None:
+            return None
+        try:
+            data = decode_jwt(token, self.secret, self.token_audience)
+            user_id = UUID4(data['user_id'])
+        except (jwt.PyJWTError, KeyError, TypeError, ValueError):
+            return None
+        try:
+            return await user_cache.get(user_id, user_manager.get)
+        except UserNotExists:
+            return None
+
+
 def get_jwt_strategy() -> JWTStrategy:
-    return JWTStrategy(
+    return CachedJWTStrategy(
         secret=settings.SECRET_KEY,
         lifetime_seconds=settings.ACCESS_TOKEN_EXPIRE_SECONDS
     )
@@ -1,20 +1,86 @@
-from typing import List
+from datetime import datetime
+from typing import Optional
+
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from starlette.exceptions import HTTPException
+from starlette import status
 
-from app.models.payout import Payout
+from app.constants.export import (
+    EXPORT_MEDIA_TYPES, PAYOUT_EXPORT_FIELDS, ExportFormat)
+from app.exceptions.pagination import InvalidCursorException
+from app.models.payout import PayoutDetail, PayoutPage
 from app.models.users import UserDB
 from app.crud import clients_payout
 from app.db import get_default_database
 from app.permissions import auth as auth_permissions
 from app.api.api_v1.dependencies.auth.auth import current_active_verified_user
+from app.utils.export import get_export_fields
+from app.utils.pagination import MAX_PAGE_SIZE
 
 payouts_router = APIRouter()
 
 
-@payouts_router.get('', response_model=List[Payout])
+@payouts_router.get('', response_model=PayoutPage)
 async def get_clients_payouts(
+        limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = None,
+        db: AsyncIOMotorDatabase = Depends(get_default_database),
+        user: UserDB = Depends(current_active_verified_user)):
+    auth_permissions.is_user_is_client(user)
+    try:
+        return await clients_payout.get_clients_payouts(
+            db, user.id, limit, cursor)
+    except InvalidCursorException:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Invalid cursor'
+        )
+
+
+# Declared before /{payout_id} so that export is not taken for an id
+@payouts_router.get('/export')
+async def export_clients_payouts(
+        export_format: ExportFormat = Query(
+            ExportFormat.NDJSON, alias='format'),
+        fields: Optional[str] = None,
+        created_after: Optional[datetime] = Query(
+            None, alias='created-after'),
+        created_before: Optional[datetime] = Query(
+            None, alias='created-before'),
+        db: AsyncIOMotorDatabase = Depends(get_default_database),
+        user: UserDB = Depends(current_active_verified_user)):
+    auth_permissions.is_user_is_client(user)
+    try:
+        export_fields = get_export_fields(fields, PAYOUT_EXPORT_FIELDS)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return StreamingResponse(
+        clients_payout.export_clients_payouts(
+            db, user.id, export_fields, export_format,
+            created_after, created_before),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            'Content-Disposition':
+            f'attachment; filename="payouts.{export_format.value}"'
+        }
+    )
+
+
+@payouts_router.get('/{payout_id}', response_model=PayoutDetail)
+async def get_clients_payout(
+        payout_id: str,
         db: AsyncIOMotorDatabase = Depends(get_default_database),
         user: UserDB = Depends(current_active_verified_user)):
     auth_permissions.is_user_is_client(user)
-    return await clients_payout.get_clients_payouts(db, user.id)
+    payout = await clients_payout.get_clients_payout(db, user.id, payout_id)
+    if not payout:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Requested payout not found'
+        )
+    return payout
@@ -15,6 +15,7 @@ from app.models.users import UserDB
 from app.crud import clients_payout_address, projects
 from app.api.api_v1.dependencies.auth.auth import current_active_verified_user
 from app.permissions import auth as auth_permissions
+from app.utils.clients_payout_address import check_payout_address_valid
 from app.worker import arq_manager
 
 payout_address_router = APIRouter()
@@ -48,6 +49,7 @@ async def create_payout_address(
                 detail='Payout address for '
                 f'{payout_address_create_data.currency_name} already exists'
             )
+    await check_payout_address_valid(payout_address_create_data)
     payout_address = \
         await clients_payout_address.create_clients_payout_address(
             db, user.id, payout_address_create_data)
@@ -75,6 +77,7 @@ async def update_payout_address(
             detail='Requested payout address not found'
         )
     auth_permissions.is_user_is_owner_of_obj(user, payout_address)
+    await check_payout_address_valid(payout_address_update_data)
     payout_address = \
         await clients_payout_address.update_clients_payout_address(
             db, payout_address_id, payout_address_update_data)
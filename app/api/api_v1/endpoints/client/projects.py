@@ -1,18 +1,26 @@
+from datetime import datetime
 from typing import List, Optional
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from pydantic.types import UUID4
 from starlette.exceptions import HTTPException
 from starlette import status
 
+from app.constants.export import (
+    EXPORT_MEDIA_TYPES, PAYMENT_EXPORT_FIELDS, ExportFormat)
 from app.db import get_default_database
 from app.models.projects import (
-    Project, ProjectCreate, ProjectCreateResponse, ProjectStats, ProjectUpdate)
+    Project, ProjectCreate, ProjectCreateResponse, ProjectPaymentStats,
+    ProjectStats, ProjectUpdate)
 from app.models.users import UserDB
-from app.crud import projects, payments
+from app.crud import projects, payments, stats
 from app.api.api_v1.dependencies.auth.auth import current_active_verified_user
+from app.exceptions.pagination import InvalidCursorException
 from app.permissions import auth as auth_permissions
+from app.utils.export import get_export_fields
+from app.utils.pagination import MAX_PAGE_SIZE
 from app.utils.projects import check_payout_address_added
 
 projects_router = APIRouter()
@@ -77,9 +85,8 @@ async def delete_project(
 @projects_router.get('/{project_id}/payments')
 async def get_projects_payments(
         project_id: UUID4,
-        limit: int = 5,
-        page_number: Optional[int] = Query(
-            None, alias='page-number'),
+        limit: int = Query(5, ge=1, le=MAX_PAGE_SIZE),
+        cursor: Optional[str] = None,
         search: str = '',
         currency_name: str = '',
         db: AsyncIOMotorDatabase = Depends(get_default_database),
@@ -93,27 +100,82 @@ async def get_projects_payments(
             detail='Requested project not found'
         )
     auth_permissions.is_user_is_owner_of_obj(user, project)
-    projects_payments = await payments.get_projects_payments(
-        db, project_id, limit, page_number, search, currency_name)
+    try:
+        projects_payments = await payments.get_projects_payments(
+            db, project_id, limit, cursor, search, currency_name)
+    except InvalidCursorException:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Invalid cursor'
+        )
     return projects_payments
 
 
+@projects_router.get('/{project_id}/payments/export')
+async def export_projects_payments(
+        project_id: UUID4,
+        export_format: ExportFormat = Query(
+            ExportFormat.NDJSON, alias='format'),
+        fields: Optional[str] = None,
+        created_after: Optional[datetime] = Query(
+            None, alias='created-after'),
+        created_before: Optional[datetime] = Query(
+            None, alias='created-before'),
+        currency_name: str = '',
+        db: AsyncIOMotorDatabase = Depends(get_default_database),
+        user: UserDB = Depends(current_active_verified_user)):
+    auth_permissions.is_user_is_client(user)
+    project = await projects.get_clients_project(
+        db, project_id, user_id=user.id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Requested project not found'
+        )
+    auth_permissions.is_user_is_owner_of_obj(user, project)
+    try:
+        export_fields = get_export_fields(fields, PAYMENT_EXPORT_FIELDS)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return StreamingResponse(
+        payments.export_projects_payments(
+            db, project_id, export_fields, export_format,
+            created_after, created_before, currency_name),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            'Content-Disposition':
+            f'attachment; filename="payments-{project_id}'
+            f'.{export_format.value}"'
+        }
+    )
+
+
 @projects_router.get('/stats', response_model=ProjectStats)
 async def get_projects_stats(
         db: AsyncIOMotorDatabase = Depends(get_default_database),
         user: UserDB = Depends(current_active_verified_user)):
     auth_permissions.is_user_is_client(user)
-    clients_projects = await projects.get_clients_projects(db, user_id=user.id)
-    response_data = {
-        'total_project': len(clients_projects),
-        'verified_domain': 0,
-        'active_project': 0,
-    }
-    for clients_project in clients_projects:
-        if clients_project.enabled_currency and\
-                len(clients_project.enabled_currency):
-            response_data['active_project'] += 1
-    return response_data
+    return await stats.get_owner_stats(db, user.id)
+
+
+@projects_router.get(
+    '/{project_id}/stats', response_model=ProjectPaymentStats)
+async def get_project_stats(
+        project_id: UUID4,
+        db: AsyncIOMotorDatabase = Depends(get_default_database),
+        user: UserDB = Depends(current_active_verified_user)):
+    auth_permissions.is_user_is_client(user)
+    project = await projects.get_clients_project(db, project_id, user.id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail='Requested project not found'
+        )
+    auth_permissions.is_user_is_owner_of_obj(user, project)
+    return await stats.get_project_stats(db, project_id)
 
 
 @projects_router.get('/{project_id}/new-api-key')
@@ -30,7 +30,8 @@ async def create_user_two_factor(
         db: AsyncIOMotorDatabase = Depends(get_default_database),
         user: UserDB = Depends(current_active_verified_user)):
     auth_permissions.is_user_is_client(user)
-    if not verify_user_password(create_data.password, user):
+    if not await verify_user_password(
+            db, create_data.password, user):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail='Invalid Password'
@@ -54,7 +55,8 @@ async def disable_user_two_factor(
         db: AsyncIOMotorDatabase = Depends(get_default_database),
         user: UserDB = Depends(current_active_verified_user)):
     auth_permissions.is_user_is_client(user)
-    if not verify_user_password(delete_data.password, user):
+    if not await verify_user_password(
+            db, delete_data.password, user):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail='Invalid Password'
@@ -69,7 +71,8 @@ async def get_new_recovery_codes(
         db: AsyncIOMotorDatabase = Depends(get_default_database),
         user: UserDB = Depends(current_active_verified_user)):
     auth_permissions.is_user_is_client(user)
-    if not verify_user_password(regeneration_data.password, user):
+    if not await verify_user_password(
+            db, regeneration_data.password, user):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail='Invalid Password'
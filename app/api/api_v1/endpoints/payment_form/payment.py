@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from fastapi.responses import StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from app.db import get_default_database
-from app.exceptions.payment import WalletAddressCreateFailureException
+from app.exceptions.payment import (
+    CurrencyPriceUnavailableException, WalletAddressCreateFailureException)
 from app.models.payments import Payment, PaymentCreate, PaymentCreateResponse
 from app.utils.payment import verify_form_id, verify_payment_id
 from app.crud import payments
@@ -25,6 +27,11 @@ async def create_payment(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail='Wallet address creation failure'
         )
+    except CurrencyPriceUnavailableException:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail='Currency price is not available'
+        )
     return payment_create_response
 
 
@@ -35,3 +42,17 @@ async def get_payment_status(
         db: AsyncIOMotorDatabase = Depends(get_default_database)):
     await verify_payment_id(db, form_id, payment_id)
     return await payment_utils.get_payment_status(db, payment_id)
+
+
+@payment_router.get('/payment-status-stream')
+async def stream_payment_status(
+        request: Request,
+        form_id: str = Query(..., alias='form-id'),
+        payment_id: str = Query(..., alias='payment-id'),
+        db: AsyncIOMotorDatabase = Depends(get_default_database)):
+    await verify_payment_id(db, form_id, payment_id)
+    return StreamingResponse(
+        payment_utils.get_payment_status_events(request, db, payment_id),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
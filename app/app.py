@@ -7,10 +7,14 @@ from sentry_sdk.integrations.asgi import SentryAsgiMiddleware
 
 from app.core.config import settings
 from app.db import mongo_manager
+from app.db.indexes import create_indexes
 from app.api.api_v1.api import api_router
 from app.worker import arq_manager
-from app.redis import redis_manager
+from app.redis import redis_manager, pubsub_manager
 from app.utils.daemon_api_wrapper import daemon_api_wrapper_manager
+from app.utils.hashing import hashing_executor
+from app.utils.user_cache import USER_CACHE_INVALIDATION_CHANNEL, user_cache
+from app.constants.payment import PAYMENT_STATUS_CHANNEL_PREFIX
 
 
 dictConfig(settings.LOGGING_CONFIG)
@@ -39,14 +43,22 @@ if settings.SITE_TYPE != 'local':
 @app.on_event("startup")
 async def startup():
     await mongo_manager.connect_to_database()
+    await create_indexes(mongo_manager.database)
     await arq_manager.init_pool()
     await redis_manager.connect_to_redis()
-    daemon_api_wrapper_manager.initialize_api_wrappers()
+    await pubsub_manager.connect_to_redis(
+        f'{PAYMENT_STATUS_CHANNEL_PREFIX}*', USER_CACHE_INVALIDATION_CHANNEL)
+    user_cache.start_listener()
+    await daemon_api_wrapper_manager.initialize_api_wrappers()
 
 
 @app.on_event("shutdown")
 async def shutdown():
     await mongo_manager.disconnect_from_database()
     await redis_manager.disconnect_from_redis()
+    user_cache.stop_listener()
+    await pubsub_manager.disconnect_from_redis()
+    await daemon_api_wrapper_manager.close_api_wrappers()
+    hashing_executor.shutdown()
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
@@ -0,0 +1,36 @@
+# Address type and its version byte or bech32 hrp derived from an extended
+# public key, keyed by currency name and the key's version bytes
+EXTENDED_PUBLIC_KEY_ADDRESS_TYPES = {
+    'bitcoin': {
+        bytes.fromhex('0488b21e'): ('p2pkh', 0x00),  # xpub
+        bytes.fromhex('04b24746'): ('p2wpkh', 'bc'),  # zpub
+        bytes.fromhex('043587cf'): ('p2pkh', 0x6f),  # tpub
+        bytes.fromhex('045f1cf6'): ('p2wpkh', 'tb'),  # vpub
+    },
+    'dogecoin': {
+        bytes.fromhex('02facafd'): ('p2pkh', 0x1e),  # dgub
+        bytes.fromhex('0488b21e'): ('p2pkh', 0x1e),  # xpub
+        bytes.fromhex('0432a9a8'): ('p2pkh', 0x71),  # tgub
+    }
+}
+
+# Address version bytes, bech32 hrps and cryptonote prefixes accepted for
+# payout addresses, keyed by currency name and network
+ADDRESS_NETWORKS = {
+    'bitcoin': {
+        'mainnet': {'base58_versions': {0x00, 0x05}, 'bech32_hrps': {'bc'}},
+        'testnet': {'base58_versions': {0x6f, 0xc4}, 'bech32_hrps': {'tb'}},
+        'regtest': {'base58_versions': {0x6f, 0xc4}, 'bech32_hrps': {'bcrt'}}
+    },
+    'dogecoin': {
+        'mainnet': {'base58_versions': {0x1e, 0x16}, 'bech32_hrps': set()},
+        'testnet': {'base58_versions': {0x71, 0xc4}, 'bech32_hrps': set()},
+        'regtest': {'base58_versions': {0x6f, 0xc4}, 'bech32_hrps': set()}
+    },
+    'monero': {
+        'mainnet': {'cryptonote_prefixes': {18, 19, 42}},
+        'testnet': {'cryptonote_prefixes': {53, 54, 63}},
+        'stagenet': {'cryptonote_prefixes': {24, 25, 36}},
+        'regtest': {'cryptonote_prefixes': {18, 19, 42}}
+    }
+}
@@ -0,0 +1,12 @@
+COINGECKO_SIMPLE_PRICE_URL = 'https://api.coingecko.com/api/v3/simple/price'
+CRYPTOCOMPARE_PRICE_MULTI_URL = \
+    'https://min-api.cryptocompare.com/data/pricemulti'
+SOUTHXCHANGE_BAZA_PRICE_URL = \
+    'https://www.southxchange.com/api/price/BAZA/TUSD'
+
+# Ticker symbols for providers that do not use coingecko ids
+CURRENCY_SYMBOLS = {
+    'bitcoin': 'BTC',
+    'dogecoin': 'DOGE',
+    'monero': 'XMR'
+}
@@ -0,0 +1,33 @@
+from enum import Enum
+
+
+class ExportFormat(str, Enum):
+    NDJSON = 'ndjson'
+    CSV = 'csv'
+
+
+EXPORT_MEDIA_TYPES = {
+    ExportFormat.NDJSON: 'application/x-ndjson',
+    ExportFormat.CSV: 'text/csv'
+}
+
+# Exportable fields in their default order, created_on is derived from _id
+PAYMENT_EXPORT_FIELDS = (
+    'payment_id',
+    'currency_name',
+    'wallet_address',
+    'amount_requested',
+    'amount_received',
+    'status',
+    'confirmations',
+    'tx_ids',
+    'created_on'
+)
+PAYOUT_EXPORT_FIELDS = (
+    'id',
+    'currency_name',
+    'amount',
+    'tx_ids',
+    'payout_processed_for_payments',
+    'created_on'
+)
@@ -17,3 +17,5 @@ TX_FIELDS_TO_SAVE = {
 }
 
 CRYPTO_ATOMIC = Decimal('0.00000001')
+
+PAYMENT_STATUS_CHANNEL_PREFIX = 'payment_status:'
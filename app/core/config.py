@@ -2,13 +2,21 @@ import secrets
 import urllib
 from typing import Any, Dict, List, Optional, Union
 
-from pydantic import BaseSettings, AnyHttpUrl, validator
+from pydantic import BaseSettings, AnyHttpUrl, root_validator, validator
+
+from app.constants.address import ADDRESS_NETWORKS
 
 
 class Settings(BaseSettings):
     API_V1_STR: str = '/api/v1'
     SECRET_KEY: str = secrets.token_urlsafe(32)
     ACCESS_TOKEN_EXPIRE_SECONDS: int = 60 * 60 * 24  # 1 Day
+    # Seconds a bcrypt verified project api key is trusted from the cache
+    API_KEY_CACHE_TTL: int = 300
+    # Users resolved from access tokens are cached for USER_CACHE_TTL
+    # seconds, at most USER_CACHE_SIZE of them in memory per node
+    USER_CACHE_TTL: int = 60
+    USER_CACHE_SIZE: int = 1024
     PROJECT_NAME: str
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
     TIMEZONE: str = 'UTC'
@@ -93,10 +101,36 @@ class Settings(BaseSettings):
     # Redis
     REDIS_HOST: str
     REDIS_PORT: int
+    # Seconds between attempts to reconnect the pubsub listener
+    REDIS_PUBSUB_RECONNECT_DELAY: int = 1
 
     # Currency supported
     ALLOWED_CURRENCY_NAME: List[str]
     ALLOWED_FIAT_CURRENCY: List[str]
+    # mainnet, testnet, stagenet or regtest, used to check address networks.
+    # <CURRENCY>_NETWORK overrides it for one currency, startup fails when
+    # an allowed currency has no such network
+    CRYPTO_NETWORK: str = 'mainnet'
+    BITCOIN_NETWORK: Optional[str] = None
+    DOGECOIN_NETWORK: Optional[str] = None
+    MONERO_NETWORK: Optional[str] = None
+
+    @root_validator
+    def validate_address_networks(cls, values: Dict[str, Any]):
+        for currency_name in values.get('ALLOWED_CURRENCY_NAME') or []:
+            networks = ADDRESS_NETWORKS.get(currency_name)
+            if not networks:
+                continue
+            network = values.get(f'{currency_name.upper()}_NETWORK') \
+                or values.get('CRYPTO_NETWORK')
+            if network not in networks:
+                raise ValueError(
+                    f"{currency_name} has no {network} network, set "
+                    f"{currency_name.upper()}_NETWORK to one of "
+                    f"{', '.join(networks)}")
+        return values
+    # Payout addresses are validated offline, this also asks the daemons
+    PAYOUT_ADDRESS_DAEMON_VALIDATION: bool = False
 
     # Bitcoin
     BITCOIN_DAEMON_HOST: str
@@ -104,12 +138,16 @@ class Settings(BaseSettings):
     BITCOIN_WALLET_RPC_PASSWORD: str
     BITCOIN_WALLET_NAME: str
     BITCOIN_MIN_CONFIRMATION_NEEDED: int
+    # Account level extended public key, when set payment addresses are
+    # derived from it and imported to the wallet as watch only
+    BITCOIN_XPUB: Optional[str] = None
 
     # Dogecoin
     DOGECOIN_DAEMON_HOST: str
     DOGECOIN_WALLET_RPC_USERNAME: str
     DOGECOIN_WALLET_RPC_PASSWORD: str
     DOGECOIN_MIN_CONFIRMATION_NEEDED: int
+    DOGECOIN_XPUB: Optional[str] = None
 
     # Monero
     MONERO_DAEMON_HOST: str
@@ -118,6 +156,9 @@ class Settings(BaseSettings):
     MONERO_MIN_CONFIRMATION_NEEDED: int
     MONERO_WALLET_NAME: str
     MONERO_WALLET_PASSWORD: str
+    # Payment subaddresses are created under these accounts in turn, the
+    # accounts must already exist in the wallet
+    MONERO_PAYMENT_ACCOUNT_INDICES: List[int] = [0]
 
     # Baza
     BAZA_COIN_DAEMON_HOST: str
@@ -126,6 +167,70 @@ class Settings(BaseSettings):
     BAZA_WALLET_PASSWORD: str
     BAZA_WALLET_API_URL: str
     BAZA_WALLET_API_KEY: str
+    # Cryptonote address prefix of baza, any prefix is accepted when unset
+    BAZA_ADDRESS_PREFIX: Optional[int] = None
+    # Seconds between wallet status refreshes and the age after which the
+    # status snapshot is refreshed inline
+    BAZA_STATUS_REFRESH_INTERVAL: float = 2.0
+    BAZA_STATUS_TTL: float = 5.0
+    # Wallet changes are saved at most every BAZA_SAVE_INTERVAL seconds or
+    # once BAZA_SAVE_MAX_UNSAVED changes are pending
+    BAZA_SAVE_INTERVAL: float = 10.0
+    BAZA_SAVE_MAX_UNSAVED: int = 20
+
+    # Wallet address pool
+    WALLET_ADDRESS_POOL_SIZE: int = 50
+    WALLET_ADDRESS_POOL_LOW_WATER_MARK: int = 10
+    WALLET_ADDRESS_POOL_LOCK_TIMEOUT: int = 300
+    # Consecutive unused addresses wallets scan when recovering from an
+    # xpub, the pools of xpub currencies stay below it. Addresses of
+    # payments that are never paid still add to the gap
+    XPUB_GAP_LIMIT: int = 20
+
+    # Hashing
+    HASHING_MAX_WORKERS: int = 4
+    HASHING_QUEUE_TIME_WARNING: float = 1.0
+    # Seconds between the logged summaries of the hashing metrics
+    HASHING_METRICS_LOG_INTERVAL: int = 300
+
+    # Currency price
+    CURRENCY_PRICE_CACHE_TTL: float = 5.0
+    PRICE_SYNC_TIMEOUT: float = 10.0
+    # Seconds before the fallback price provider is asked as well
+    PRICE_SYNC_HEDGE_DELAY: float = 2.0
+
+    # Export
+    # Documents fetched per cursor batch and rows per streamed chunk
+    EXPORT_BATCH_SIZE: int = 500
+
+    # Payment watcher
+    # Seconds between watcher runs, the runs are scheduled on the seconds
+    # of each minute so this must divide 60
+    PAYMENT_WATCHER_INTERVAL: int = 15
+
+    @validator("PAYMENT_WATCHER_INTERVAL")
+    def validate_payment_watcher_interval(cls, v: int) -> int:
+        if v <= 0 or 60 % v:
+            raise ValueError(
+                'PAYMENT_WATCHER_INTERVAL must be a divisor of 60')
+        return v
+
+    PAYMENT_WATCHER_BATCH_SIZE: int = 50
+    PAYMENT_WATCHER_LOCK_TIMEOUT: int = 300
+    PAYMENT_STATUS_STREAM_KEEPALIVE: int = 15
+    # Seconds a merchant webhook gets to respond before the call is retried
+    WEBHOOK_TIMEOUT: float = 10.0
+    # Blocks behind the wallet height a baza payment starts scanning from
+    # and the most blocks fetched from the wallet api in one watcher run
+    BAZA_SCAN_START_OFFSET: int = 500
+    BAZA_SCAN_MAX_BLOCKS: int = 1000
+
+    # Daemon RPC
+    DAEMON_RPC_TIMEOUT: float = 30.0
+    DAEMON_RPC_CONNECT_TIMEOUT: float = 5.0
+    DAEMON_RPC_MAX_CONNECTIONS: int = 10
+    DAEMON_RPC_MAX_KEEPALIVE_CONNECTIONS: int = 5
+    DAEMON_RPC_KEEPALIVE_EXPIRY: float = 30.0
 
     # Sentry
     SENTRY_DSN: AnyHttpUrl
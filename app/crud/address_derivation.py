@@ -0,0 +1,30 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
+
+
+async def get_next_derivation_index(
+        db: AsyncIOMotorDatabase, currency_name: str) -> int:
+    derivation_index = await db.address_derivation_indices.find_one(
+        {'currency_name': currency_name})
+    if derivation_index:
+        return derivation_index['next_index']
+    return 0
+
+
+async def claim_derivation_index(
+        db: AsyncIOMotorDatabase, currency_name: str, index: int) -> bool:
+    """
+        Moves the next derivation index past index with a compare and set,
+        returns False when a concurrent caller claimed it first
+    """
+    try:
+        await db.address_derivation_indices.update_one(
+            {'currency_name': currency_name, 'next_index': index},
+            {'$set': {'next_index': index + 1}},
+            upsert=True
+        )
+    except DuplicateKeyError:
+        # The unique index on currency_name rejects the upsert when the
+        # next index already moved on
+        return False
+    return True
@@ -0,0 +1,16 @@
+from typing import Optional, Union
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+
+async def get_chain_cursor(
+        db: AsyncIOMotorDatabase, name: str) -> Optional[Union[str, int]]:
+    chain_cursor = await db.chain_cursors.find_one({'name': name})
+    if chain_cursor:
+        return chain_cursor['cursor']
+
+
+async def set_chain_cursor(
+        db: AsyncIOMotorDatabase, name: str, cursor: Union[str, int]) -> None:
+    await db.chain_cursors.update_one(
+        {'name': name}, {'$set': {'cursor': cursor}}, upsert=True)
@@ -1,22 +1,60 @@
-from typing import List
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+
 from bson import ObjectId
+from bson.errors import InvalidId
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from pydantic import UUID4
-from pymongo import DESCENDING
 
-from app.models.payout import Payout
+from app.constants.export import ExportFormat
+from app.models.payout import Payout, PayoutDetail, PayoutPage
+from app.utils.export import get_created_on_query, stream_export
+from app.utils.pagination import paginate
 
 
 async def get_clients_payouts(
-        db: AsyncIOMotorDatabase, user_id: UUID4) -> List[Payout]:
-    payouts = []
-    payout_cur = db.payouts.find(
-        {'owner_id': user_id}).sort('_id', DESCENDING)
-    async for payout in payout_cur:
-        payouts.append(
+        db: AsyncIOMotorDatabase, user_id: UUID4,
+        limit: int = 20, cursor: Optional[str] = None) -> PayoutPage:
+    payouts, next_cursor = await paginate(
+        db.payouts, {'owner_id': user_id}, limit, cursor,
+        {'raw_tx_data': False})
+    return PayoutPage(
+        payouts=[
             Payout(
                 **payout,
+                id=str(payout['_id']),
                 created_on=ObjectId(payout['_id']).generation_time
             )
+            for payout in payouts
+        ],
+        next_cursor=next_cursor
+    )
+
+
+async def get_clients_payout(
+        db: AsyncIOMotorDatabase, user_id: UUID4,
+        payout_id: str) -> Optional[PayoutDetail]:
+    try:
+        payout_object_id = ObjectId(payout_id)
+    except InvalidId:
+        return None
+    payout = await db.payouts.find_one(
+        {'_id': payout_object_id, 'owner_id': user_id})
+    if payout:
+        return PayoutDetail(
+            **payout,
+            id=str(payout['_id']),
+            created_on=payout_object_id.generation_time
         )
-    return payouts
+
+
+def export_clients_payouts(
+        db: AsyncIOMotorDatabase, user_id: UUID4,
+        fields: List[str], export_format: ExportFormat,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None) -> AsyncIterator[str]:
+    query = {
+        'owner_id': user_id,
+        **get_created_on_query(created_after, created_before)
+    }
+    return stream_export(db.payouts, query, fields, export_format)
@@ -0,0 +1,195 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Optional
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pydantic.types import UUID4
+
+from app.constants.payment_status import PaymentStatus
+
+# One counter document per project holds the payment totals per currency,
+# the counts by status and the received volume per currency. It serves
+# the payment list totals and the project and owner stats alike
+
+# Events older than this are expected to be committed when a counter is
+# seeded, it also covers the clock skew between the API nodes
+SEED_WATERMARK_DELAY = timedelta(minutes=1)
+UNIX_EPOCH = datetime.fromtimestamp(0, timezone.utc)
+
+
+def get_seed_watermark() -> datetime:
+    """
+        Seeding counts what happened before the watermark and increments
+        only count what happened from it on, so every event is counted
+        exactly once. ObjectId times have second precision
+    """
+    return (datetime.now(timezone.utc) - SEED_WATERMARK_DELAY).replace(
+        microsecond=0)
+
+
+async def increment_payment_counter(
+        db: AsyncIOMotorDatabase, project_id: UUID4,
+        increments: Dict, event_time: datetime) -> None:
+    for _ in range(2):
+        result = await db.payment_counters.update_one(
+            {'project_id': project_id, 'counted_before': {'$lte': event_time}},
+            {'$inc': increments}
+        )
+        if result.matched_count or await db.payment_counters.count_documents(
+                {
+                    'project_id': project_id,
+                    'counted_before': {'$gt': event_time}
+                }, limit=1):
+            # A counter seeded after the event counted it
+            return
+        # Seeding does nothing when another request seeded the counter
+        # meanwhile, the increment is then applied to that counter
+        await seed_payment_counter(db, project_id)
+
+
+async def count_payment_created(
+        db: AsyncIOMotorDatabase, project_id: UUID4,
+        currency_name: str, payment_object_id: ObjectId) -> None:
+    await increment_payment_counter(
+        db, project_id,
+        {
+            'total': 1,
+            f'currencies.{currency_name}': 1,
+            f'payments.{PaymentStatus.PENDING.value}': 1
+        },
+        payment_object_id.generation_time
+    )
+
+
+async def count_payment_transition(
+        db: AsyncIOMotorDatabase, payment: Dict) -> None:
+    """
+        Called once by the caller that moved the payment out of PENDING
+    """
+    await increment_payment_counter(
+        db, payment['related_project_id'],
+        {
+            f'payments.{PaymentStatus.PENDING.value}': -1,
+            f'payments.{PaymentStatus(payment["status"]).value}': 1,
+            f'received.{payment["currency_name"]}':
+            payment['amount_received']
+        },
+        payment['status_changed_on']
+    )
+
+
+async def create_payment_counter(
+        db: AsyncIOMotorDatabase, project: Dict) -> None:
+    # A new project has no payments, so all of them are counted from now
+    await db.payment_counters.update_one(
+        {'project_id': project['id']},
+        {
+            '$setOnInsert': {
+                'owner_id': project['owner_id'],
+                'total': 0,
+                'currencies': {},
+                'payments': {},
+                'received': {},
+                'counted_before': UNIX_EPOCH
+            }
+        },
+        upsert=True
+    )
+
+
+async def delete_payment_counter(
+        db: AsyncIOMotorDatabase, project_id: UUID4) -> None:
+    await db.payment_counters.delete_one({'project_id': project_id})
+
+
+async def seed_payment_counter(
+        db: AsyncIOMotorDatabase, project_id: UUID4) -> Optional[Dict]:
+    """
+        Counts the payments of a project created before the watermark,
+        those that left PENDING after it are counted as PENDING still.
+        The first seed of a project wins and later seeds change nothing,
+        deleted projects are not seeded
+    """
+    project = await db.projects.find_one(
+        {'id': project_id}, {'owner_id': True})
+    if not project:
+        return None
+    counted_before = get_seed_watermark()
+    payment_counter = {
+        'owner_id': project['owner_id'],
+        'total': 0,
+        'currencies': {},
+        'payments': {},
+        'received': {},
+        'counted_before': counted_before
+    }
+    # Payments that left PENDING before status_changed_on was recorded
+    # count as changed at the epoch
+    status_changed = {
+        '$lt': [
+            {'$ifNull': ['$status_changed_on', UNIX_EPOCH]},
+            counted_before
+        ]
+    }
+    async for payment_count in db.payments.aggregate([
+        {
+            '$match': {
+                'related_project_id': project_id,
+                '_id': {'$lt': ObjectId.from_datetime(counted_before)}
+            }
+        },
+        {
+            '$group': {
+                '_id': {
+                    'currency_name': '$currency_name',
+                    'status': {
+                        '$cond': [
+                            status_changed,
+                            '$status',
+                            PaymentStatus.PENDING.value
+                        ]
+                    }
+                },
+                'count': {'$sum': 1},
+                'amount_received': {'$sum': '$amount_received'}
+            }
+        }
+    ]):
+        currency_name = payment_count['_id']['currency_name']
+        status = payment_count['_id']['status']
+        payment_counter['total'] += payment_count['count']
+        for field, key in (('currencies', currency_name),
+                           ('payments', status)):
+            payment_counter[field][key] = \
+                payment_counter[field].get(key, 0) + payment_count['count']
+        if status != PaymentStatus.PENDING.value:
+            payment_counter['received'][currency_name] = \
+                payment_counter['received'].get(currency_name, Decimal('0')) \
+                + payment_count['amount_received']
+    await db.payment_counters.update_one(
+        {'project_id': project_id},
+        {'$setOnInsert': payment_counter},
+        upsert=True
+    )
+    return await db.payment_counters.find_one({'project_id': project_id})
+
+
+async def get_payment_counter(
+        db: AsyncIOMotorDatabase, project_id: UUID4) -> Optional[Dict]:
+    payment_counter = await db.payment_counters.find_one(
+        {'project_id': project_id})
+    if not payment_counter:
+        payment_counter = await seed_payment_counter(db, project_id)
+    return payment_counter
+
+
+async def get_payment_count(
+        db: AsyncIOMotorDatabase, project_id: UUID4,
+        currency_name: str = '') -> int:
+    payment_counter = await get_payment_counter(db, project_id)
+    if not payment_counter:
+        return 0
+    if currency_name:
+        return payment_counter['currencies'].get(currency_name, 0)
+    return payment_counter['total']
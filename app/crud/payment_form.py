@@ -1,19 +1,28 @@
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
 
 from app.models.payment_form import (
     PaymentFormDB, PaymentFormCreate, PaymentFormResponse)
+from app.utils.ulid import MAX_ID_GENERATION_ATTEMPTS
 
 
 async def create_payment_form(
         db: AsyncIOMotorDatabase,
         payment_form_create_data: PaymentFormCreate) -> PaymentFormResponse:
-    result = await db.payment_forms.insert_one(
-        PaymentFormDB(
-            **payment_form_create_data.dict(),
-            related_project_id=payment_form_create_data.project_id
-        ).dict()
-    )
+    # Uniqueness is enforced by the unique index on id
+    for attempt in range(MAX_ID_GENERATION_ATTEMPTS):
+        try:
+            result = await db.payment_forms.insert_one(
+                PaymentFormDB(
+                    **payment_form_create_data.dict(),
+                    related_project_id=payment_form_create_data.project_id
+                ).dict()
+            )
+            break
+        except DuplicateKeyError:
+            if attempt == MAX_ID_GENERATION_ATTEMPTS - 1:
+                raise
     payment_form = await db.payment_forms.find_one({'_id': result.inserted_id})
     return PaymentFormResponse(
         **payment_form,
@@ -1,28 +1,34 @@
+import logging
 from bson import ObjectId
-from typing import Optional, Dict
+from datetime import datetime
+from typing import AsyncIterator, Optional, Dict, List
 from decimal import Decimal, ROUND_HALF_UP
 
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from pydantic.types import UUID4
-from pymongo import DESCENDING
+from pymongo.errors import DuplicateKeyError
 
-from app.exceptions.payment import WalletAddressCreateFailureException
+from app.constants.export import ExportFormat
+from app.core.config import settings
+from app.crud.payment_counters import count_payment_created, get_payment_count
+from app.exceptions.payment import (
+    CurrencyPriceUnavailableException, WalletAddressCreateFailureException)
 from app.models.payments import (
     Payment, PaymentCreate, PaymentCreateResponse,
     PaymentDB, PaymentUpdate)
-from app.utils.payment import (
-    get_currency_price, get_wallet_address, get_unique_payment_id)
+from app.utils.export import get_created_on_query, stream_export
+from app.utils.pagination import paginate
+from app.utils.payment import get_currency_price, get_wallet_address
+from app.utils.ulid import MAX_ID_GENERATION_ATTEMPTS, generate_ulid
 from app.constants.payment import CRYPTO_ATOMIC
 
+logger = logging.getLogger(settings.LOGGER_NAME)
+
 
 async def get_projects_payments(
         db: AsyncIOMotorDatabase, project_id: UUID4,
-        limit: int = 5, page_number: int = 1,
+        limit: int = 5, cursor: Optional[str] = None,
         search: str = '', currency_name: str = '') -> Dict:
-    payments = []
-    skip = 0
-    if not search and not currency_name:
-        skip = limit * (page_number - 1)
     query = {'related_project_id': project_id}
     if search:
         query['$or'] = [
@@ -31,24 +37,37 @@ async def get_projects_payments(
         ]
     if currency_name:
         query['currency_name'] = currency_name
-    payments_cur = db.payments.find(query).skip(
-        skip).limit(limit).sort('_id', DESCENDING)
-    async for payment in payments_cur:
-        payments.append(
+    payments, next_cursor = await paginate(
+        db.payments, query, limit, cursor, {'raw_tx_data': False})
+    projects_payments = {
+        "payments": [
             Payment(
                 **payment,
                 created_on=ObjectId(payment['_id']).generation_time
             )
-        )
-    if page_number == 1:
-        return {
-            "payments": payments,
-            "total_payments": await db.payments.count_documents(
-                {'related_project_id': project_id})
-        }
-    return {
-        "payments": payments
+            for payment in payments
+        ],
+        "next_cursor": next_cursor
     }
+    if not cursor and not search:
+        projects_payments["total_payments"] = await get_payment_count(
+            db, project_id, currency_name)
+    return projects_payments
+
+
+def export_projects_payments(
+        db: AsyncIOMotorDatabase, project_id: UUID4,
+        fields: List[str], export_format: ExportFormat,
+        created_after: Optional[datetime] = None,
+        created_before: Optional[datetime] = None,
+        currency_name: str = '') -> AsyncIterator[str]:
+    query = {
+        'related_project_id': project_id,
+        **get_created_on_query(created_after, created_before)
+    }
+    if currency_name:
+        query['currency_name'] = currency_name
+    return stream_export(db.payments, query, fields, export_format)
 
 
 async def get_payment(db: AsyncIOMotorDatabase, payment_id: str) -> PaymentDB:
@@ -60,29 +79,53 @@ async def create_payment(
         db: AsyncIOMotorDatabase,
         payment_create_data: PaymentCreate) -> Optional[PaymentCreateResponse]:
     currency_name = payment_create_data.currency_name
-    wallet_address = get_wallet_address(currency_name)
-    payment_id = await get_unique_payment_id(db)
-    if not wallet_address:
-        raise WalletAddressCreateFailureException()
     payment_create_data = payment_create_data.dict()
     payment_form = await db.payment_forms.find_one(
         {'id': payment_create_data['form_id']})
+    # Checked before an address is taken from the pool
+    currency_price = await get_currency_price(
+        currency_name, payment_form['fiat_currency'])
+    if currency_price is None:
+        raise CurrencyPriceUnavailableException()
+    wallet_address = await get_wallet_address(db, currency_name)
+    if not wallet_address:
+        raise WalletAddressCreateFailureException()
     amount_requested = Decimal(
-        payment_form['amount_requested']
-        * await get_currency_price(payment_create_data['currency_name']))\
+        payment_form['amount_requested'] * currency_price)\
         .quantize(CRYPTO_ATOMIC, ROUND_HALF_UP)
-    await db.payments.insert_one(
-        PaymentDB(
-            **payment_create_data,
-            amount_requested=amount_requested,
-            payment_id=payment_id,
-            wallet_address=wallet_address
-            if currency_name != 'monero' else wallet_address['address'],
-            related_project_id=payment_create_data['project_id'],
-            monero_account_index=None
-            if currency_name != 'monero' else wallet_address['account_index']
-        ).dict()
-    )
+    # Uniqueness is enforced by the unique index on payment_id
+    for attempt in range(MAX_ID_GENERATION_ATTEMPTS):
+        payment_id = generate_ulid()
+        try:
+            result = await db.payments.insert_one(
+                PaymentDB(
+                    **payment_create_data,
+                    amount_requested=amount_requested,
+                    payment_id=payment_id,
+                    wallet_address=wallet_address
+                    if currency_name != 'monero'
+                    else wallet_address['address'],
+                    related_project_id=payment_create_data['project_id'],
+                    monero_account_index=None
+                    if currency_name != 'monero'
+                    else wallet_address['account_index'],
+                    monero_address_index=None
+                    if currency_name != 'monero'
+                    else wallet_address['address_index']
+                ).dict()
+            )
+            break
+        except DuplicateKeyError:
+            if attempt == MAX_ID_GENERATION_ATTEMPTS - 1:
+                raise
+    # The payment is already stored, failing the counter must not fail
+    # its creation
+    try:
+        await count_payment_created(
+            db, payment_create_data['project_id'], currency_name,
+            result.inserted_id)
+    except Exception as e:
+        logger.error(f"Counting payment {payment_id} failed: {e}")
     return PaymentCreateResponse(
         **payment_create_data,
         payment_id=payment_id,
@@ -5,11 +5,13 @@ from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from pydantic.types import UUID4
 
+from app.crud.stats import (
+    record_project_created, record_project_deleted, record_project_updated)
 from app.models.projects import (
     ProjectCreate, ProjectCreateResponse, ProjectDB, Project,
     ProjectUpdate
 )
-from app.utils.api_key import hash_api_key
+from app.utils.api_key import hash_api_key, verified_api_key_cache
 
 
 async def get_clients_project(
@@ -42,10 +44,11 @@ async def create_clients_project(
     payment_signature_secret = secrets.token_urlsafe(32)
     project_data = project_data.dict()
     project_data['owner_id'] = user_id
-    project_data['api_key_hashed'] = hash_api_key(api_key)
+    project_data['api_key_hashed'] = await hash_api_key(api_key)
     project_data['payment_signature_secret'] = payment_signature_secret
     result = await db.projects.insert_one(ProjectDB(**project_data).dict())
     project = await db.projects.find_one(result.inserted_id)
+    await record_project_created(db, project)
     return ProjectCreateResponse(
         **project,
         date_created=ObjectId(project['_id']).generation_time,
@@ -57,9 +60,10 @@ async def update_clients_project(
         db: AsyncIOMotorDatabase,
         project_id: UUID4,
         update_data: ProjectUpdate) -> Project:
-    await db.projects.update_one(
+    old_project = await db.projects.find_one_and_update(
         {'id': project_id}, {'$set': update_data.dict()})
     project = await db.projects.find_one({'id': project_id})
+    await record_project_updated(db, old_project, project)
     return Project(
         **project,
         date_created=ObjectId(project['_id']).generation_time
@@ -69,15 +73,19 @@ async def update_clients_project(
 async def delete_clients_project(
         db: AsyncIOMotorDatabase, project_id: UUID4
 ) -> None:
-    await db.projects.delete_one({'id': project_id})
+    project = await db.projects.find_one_and_delete({'id': project_id})
+    if project:
+        await record_project_deleted(db, project)
+    await verified_api_key_cache.invalidate(project_id)
 
 
 async def get_new_api_key(db: AsyncIOMotorDatabase, project: ProjectDB) -> str:
     api_key = secrets.token_urlsafe(32)
     await db.projects.update_one(
         {'id': project.id},
-        {'$set': {'api_key_hashed': hash_api_key(api_key)}}
+        {'$set': {'api_key_hashed': await hash_api_key(api_key)}}
     )
+    await verified_api_key_cache.invalidate(project.id)
     return api_key
 
 
@@ -0,0 +1,124 @@
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pydantic.types import UUID4
+
+from app.crud.payment_counters import (
+    create_payment_counter, delete_payment_counter, get_payment_counter,
+    seed_payment_counter)
+
+# Owner documents hold the project counts, which are recounted on every
+# project change. The payment figures live in the per-project payment
+# counters and are summed when the stats are read, so creating or moving
+# a payment only ever updates its project's counter
+
+
+def is_project_active(project: Dict) -> bool:
+    return bool(project.get('enabled_currency'))
+
+
+async def recount_projects(
+        db: AsyncIOMotorDatabase, owner_id: UUID4) -> None:
+    """
+        Sets the project counts of a seeded owner document from the
+        projects themselves, which is safe to repeat
+    """
+    projects = await db.projects.find(
+        {'owner_id': owner_id}, {'enabled_currency': True}).to_list(None)
+    await db.stats.update_one(
+        {'owner_id': owner_id},
+        {
+            '$set': {
+                'total_project': len(projects),
+                'active_project': sum(
+                    is_project_active(project) for project in projects)
+            }
+        }
+    )
+
+
+async def record_project_created(
+        db: AsyncIOMotorDatabase, project: Dict) -> None:
+    await create_payment_counter(db, project)
+    await recount_projects(db, project['owner_id'])
+
+
+async def record_project_updated(
+        db: AsyncIOMotorDatabase, project: Dict,
+        updated_project: Dict) -> None:
+    if is_project_active(updated_project) != is_project_active(project):
+        await recount_projects(db, project['owner_id'])
+
+
+async def record_project_deleted(
+        db: AsyncIOMotorDatabase, project: Dict) -> None:
+    """
+        Payments of deleted projects are left out of the owner stats
+    """
+    await delete_payment_counter(db, project['id'])
+    await recount_projects(db, project['owner_id'])
+
+
+async def seed_owner_stats(
+        db: AsyncIOMotorDatabase, owner_id: UUID4) -> Dict:
+    projects = await db.projects.find(
+        {'owner_id': owner_id}, {'enabled_currency': True}).to_list(None)
+    await db.stats.update_one(
+        {'owner_id': owner_id},
+        {
+            '$setOnInsert': {
+                'total_project': len(projects),
+                'active_project': sum(
+                    is_project_active(project) for project in projects),
+                'verified_domain': 0
+            }
+        },
+        upsert=True
+    )
+    return await db.stats.find_one({'owner_id': owner_id})
+
+
+async def get_owner_payment_counters(
+        db: AsyncIOMotorDatabase, owner_id: UUID4,
+        total_project: int) -> List[Dict]:
+    projection = {'project_id': True, 'payments': True, 'received': True}
+    payment_counters = await db.payment_counters.find(
+        {'owner_id': owner_id}, projection).to_list(None)
+    if len(payment_counters) < total_project:
+        # Projects created before the counters existed are seeded here
+        counted_project_ids = {
+            payment_counter['project_id']
+            for payment_counter in payment_counters
+        }
+        async for project in db.projects.find(
+                {'owner_id': owner_id}, {'id': True}):
+            if project['id'] not in counted_project_ids:
+                await seed_payment_counter(db, project['id'])
+        payment_counters = await db.payment_counters.find(
+            {'owner_id': owner_id}, projection).to_list(None)
+    return payment_counters
+
+
+async def get_owner_stats(
+        db: AsyncIOMotorDatabase, owner_id: UUID4) -> Dict:
+    owner_stats = await db.stats.find_one({'owner_id': owner_id})
+    if not owner_stats:
+        owner_stats = await seed_owner_stats(db, owner_id)
+    owner_stats['payments'] = {}
+    owner_stats['received'] = {}
+    for payment_counter in await get_owner_payment_counters(
+            db, owner_id, owner_stats['total_project']):
+        for status, count in payment_counter['payments'].items():
+            owner_stats['payments'][status] = \
+                owner_stats['payments'].get(status, 0) + count
+        for currency_name, amount in payment_counter['received'].items():
+            owner_stats['received'][currency_name] = \
+                owner_stats['received'].get(currency_name, Decimal('0')) \
+                + amount
+    return owner_stats
+
+
+async def get_project_stats(
+        db: AsyncIOMotorDatabase, project_id: UUID4) -> Optional[Dict]:
+    return await get_payment_counter(db, project_id)
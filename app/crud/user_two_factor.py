@@ -1,3 +1,6 @@
+import asyncio
+from typing import Dict, List
+
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from pydantic import UUID4
 from pyotp.totp import TOTP
@@ -11,7 +14,8 @@ from app.models.users import (
     UserTwoFactorResponse, UserTwoFactorUpdate, UserTwoFactorUpdateResponse,
     UserDB)
 from app.utils.user_two_factor import (
-    get_recovery_codes, verify_two_factor_recovery_code)
+    get_recovery_code_lookup_tag, get_recovery_codes,
+    verify_two_factor_recovery_code)
 from app.worker import arq_manager
 
 
@@ -48,7 +52,8 @@ async def enable_user_two_factor(
         update_data: UserTwoFactorUpdate) -> UserTwoFactorUpdateResponse:
     two_factor = await db.user_two_factor.find_one({'owner_id': user_id})
     if TOTP(two_factor['secret_key']).verify(update_data.code, valid_window=1):
-        recovery_codes, recovery_codes_hashed = get_recovery_codes()
+        recovery_codes, recovery_codes_hashed = await get_recovery_codes(
+            user_id)
         await db.user_two_factor.update_one(
             {'owner_id': user_id},
             {
@@ -80,7 +85,7 @@ async def disable_user_two_factor(
 async def regenerate_two_factor_recovery_codes(
         db: AsyncIOMotorDatabase,
         user_id: UUID4) -> UserTwoFactorUpdateResponse:
-    recovery_codes, recovery_codes_hashed = get_recovery_codes()
+    recovery_codes, recovery_codes_hashed = await get_recovery_codes(user_id)
     await db.user_two_factor.update_one(
         {'owner_id': user_id},
         {
@@ -96,27 +101,63 @@ async def regenerate_two_factor_recovery_codes(
     return UserTwoFactorUpdateResponse(recovery_codes=recovery_codes)
 
 
+async def consume_two_factor_recovery_code(
+        db: AsyncIOMotorDatabase, user_id: UUID4, match: Dict) -> bool:
+    """
+        Flips the matched code to used only if it is still unused, so a
+        code can not be redeemed twice by concurrent logins
+    """
+    result = await db.user_two_factor.update_one(
+        {
+            'owner_id': user_id,
+            'recovery_codes_hashed': {
+                '$elemMatch': {**match, 'used': False}
+            }
+        },
+        {'$set': {'recovery_codes_hashed.$.used': True}}
+    )
+    return result.modified_count == 1
+
+
+async def verify_legacy_two_factor_recovery_code(
+        db: AsyncIOMotorDatabase, user_id: UUID4,
+        code: str, recovery_codes_hashed: List[Dict]) -> bool:
+    """
+        Codes generated before lookup tags existed can only be found by
+        checking each of them
+    """
+    unused_recovery_codes_hashed = [
+        recovery_code_hashed
+        for recovery_code_hashed in recovery_codes_hashed
+        if not recovery_code_hashed['used']
+        and 'lookup_tag' not in recovery_code_hashed
+    ]
+    recovery_codes_verified = await asyncio.gather(*[
+        verify_two_factor_recovery_code(code, recovery_code_hashed['code'])
+        for recovery_code_hashed in unused_recovery_codes_hashed
+    ])
+    for recovery_code_hashed, recovery_code_verified in zip(
+            unused_recovery_codes_hashed, recovery_codes_verified):
+        if recovery_code_verified:
+            return await consume_two_factor_recovery_code(
+                db, user_id, {'code': recovery_code_hashed['code']})
+    return False
+
+
 async def verify_two_factor_code(
         db: AsyncIOMotorDatabase, user_id: UUID4, code: int) -> bool:
     two_factor = await db.user_two_factor.find_one({'owner_id': user_id})
-    two_factor_code_verified = TOTP(
-        two_factor['secret_key']).verify(code, valid_window=1)
-    if not two_factor_code_verified:
-        recovery_codes_hashed = two_factor['recovery_codes_hashed']
-        for recovery_code_hashed in recovery_codes_hashed:
-            if not recovery_code_hashed['used']:
-                two_factor_code_verified = verify_two_factor_recovery_code(
-                    str(code), recovery_code_hashed['code'])
-                if two_factor_code_verified:
-                    recovery_code_hashed['used'] = True
-                    break
-        if two_factor_code_verified:
-            await db.user_two_factor.update_one(
-                {'owner_id': user_id},
-                {
-                    '$set': {
-                        'recovery_codes_hashed': recovery_codes_hashed,
-                    }
-                }
-            )
-    return two_factor_code_verified
+    if TOTP(two_factor['secret_key']).verify(code, valid_window=1):
+        return True
+    recovery_codes_hashed = two_factor.get('recovery_codes_hashed') or []
+    lookup_tag = get_recovery_code_lookup_tag(user_id, str(code))
+    for recovery_code_hashed in recovery_codes_hashed:
+        if recovery_code_hashed.get('lookup_tag') == lookup_tag:
+            if recovery_code_hashed['used'] or \
+                    not await verify_two_factor_recovery_code(
+                        str(code), recovery_code_hashed['code']):
+                return False
+            return await consume_two_factor_recovery_code(
+                db, user_id, {'lookup_tag': lookup_tag})
+    return await verify_legacy_two_factor_recovery_code(
+        db, user_id, str(code), recovery_codes_hashed)
@@ -0,0 +1,28 @@
+from typing import List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING
+
+from app.models.wallet_address_pool import WalletAddressPoolDB
+
+
+async def pop_wallet_address(
+        db: AsyncIOMotorDatabase,
+        currency_name: str) -> Optional[WalletAddressPoolDB]:
+    wallet_address = await db.wallet_address_pool.find_one_and_delete(
+        {'currency_name': currency_name}, sort=[('_id', ASCENDING)])
+    if wallet_address:
+        return WalletAddressPoolDB(**wallet_address)
+
+
+async def count_wallet_addresses(
+        db: AsyncIOMotorDatabase, currency_name: str) -> int:
+    return await db.wallet_address_pool.count_documents(
+        {'currency_name': currency_name})
+
+
+async def add_wallet_addresses(
+        db: AsyncIOMotorDatabase,
+        wallet_addresses: List[WalletAddressPoolDB]) -> None:
+    await db.wallet_address_pool.insert_many(
+        [wallet_address.dict() for wallet_address in wallet_addresses])
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from typing import Dict, List
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from app.core.config import settings
+from app.db import mongo_manager
+
+logger = logging.getLogger(settings.LOGGER_NAME)
+
+# Every index the queries rely on, keyed by collection name. Index names
+# are generated from the keys, so changing the options of an existing
+# index needs the old index dropped first
+INDEXES: Dict[str, List[IndexModel]] = {
+    'payments': [
+        IndexModel([('payment_id', ASCENDING)], unique=True),
+        IndexModel([('related_project_id', ASCENDING), ('_id', DESCENDING)]),
+        IndexModel([
+            ('related_project_id', ASCENDING),
+            ('currency_name', ASCENDING),
+            ('_id', DESCENDING)
+        ]),
+        IndexModel([('tx_ids', ASCENDING)]),
+        IndexModel([('wallet_address', ASCENDING)]),
+        IndexModel(
+            [('jobs_dispatched', ASCENDING)],
+            partialFilterExpression={'jobs_dispatched': False}),
+        IndexModel([
+            ('currency_name', ASCENDING),
+            ('status', ASCENDING),
+            ('scan_height', ASCENDING)
+        ])
+    ],
+    'payment_forms': [
+        IndexModel([('id', ASCENDING)], unique=True)
+    ],
+    'projects': [
+        IndexModel([('id', ASCENDING)]),
+        IndexModel([('owner_id', ASCENDING)])
+    ],
+    'payout_queues': [
+        IndexModel([('owner_id', ASCENDING), ('for_currency', ASCENDING)])
+    ],
+    'payout_address': [
+        IndexModel([('id', ASCENDING)]),
+        IndexModel([('owner_id', ASCENDING), ('currency_name', ASCENDING)])
+    ],
+    'payouts': [
+        IndexModel([('owner_id', ASCENDING), ('_id', DESCENDING)])
+    ],
+    'user_two_factor': [
+        IndexModel([('owner_id', ASCENDING)])
+    ],
+    'wallet_address_pool': [
+        IndexModel([('currency_name', ASCENDING), ('_id', ASCENDING)])
+    ],
+    'payment_counters': [
+        IndexModel([('project_id', ASCENDING)], unique=True),
+        IndexModel([('owner_id', ASCENDING)])
+    ],
+    'stats': [
+        IndexModel([('owner_id', ASCENDING)], unique=True)
+    ],
+    'chain_cursors': [
+        IndexModel([('name', ASCENDING)], unique=True)
+    ],
+    'address_derivation_indices': [
+        IndexModel([('currency_name', ASCENDING)], unique=True)
+    ]
+}
+
+
+async def create_indexes(db: AsyncIOMotorDatabase) -> None:
+    """
+        Creating an index that already exists with the same keys and
+        options is a no-op, so this runs on every startup. A unique index
+        that can not be built fails startup, the id generation retries and
+        the counter upserts rely on it
+    """
+    for collection_name, indexes in INDEXES.items():
+        for index in indexes:
+            try:
+                await db[collection_name].create_indexes([index])
+            except OperationFailure as e:
+                logger.error(
+                    f"Creating index {index.document['name']} on "
+                    f"{collection_name} failed: {e}")
+                if index.document.get('unique'):
+                    raise
+
+
+async def get_index_stats(db: AsyncIOMotorDatabase) -> Dict[str, List[Dict]]:
+    index_stats = {}
+    for collection_name in INDEXES:
+        index_stats[collection_name] = [
+            index_stat async for index_stat in db[collection_name].aggregate(
+                [{'$indexStats': {}}])
+        ]
+    return index_stats
+
+
+async def report_index_usage():
+    await mongo_manager.connect_to_database()
+    try:
+        index_stats = await get_index_stats(mongo_manager.database)
+    finally:
+        await mongo_manager.disconnect_from_database()
+    for collection_name, indexes in INDEXES.items():
+        print(collection_name)
+        used = {
+            index_stat['name']: index_stat
+            for index_stat in index_stats[collection_name]
+        }
+        for index in indexes:
+            name = index.document['name']
+            if name not in used:
+                print(f"    {name}: missing")
+        for name, index_stat in sorted(used.items()):
+            registered = any(
+                index.document['name'] == name for index in indexes)
+            print(
+                f"    {name}: {index_stat['accesses']['ops']} ops since "
+                f"{index_stat['accesses']['since']:%Y-%m-%d %H:%M}"
+                f"{'' if registered or name == '_id_' else ' (unregistered)'}"
+            )
+
+
+if __name__ == '__main__':
+    asyncio.run(report_index_usage())
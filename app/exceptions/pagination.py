@@ -0,0 +1,5 @@
+from app.exceptions import GatewayProcessorException
+
+
+class InvalidCursorException(GatewayProcessorException):
+    pass
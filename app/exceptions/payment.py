@@ -3,3 +3,7 @@ from app.exceptions import GatewayProcessorException
 
 class WalletAddressCreateFailureException(GatewayProcessorException):
     pass
+
+
+class CurrencyPriceUnavailableException(GatewayProcessorException):
+    pass
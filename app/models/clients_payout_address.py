@@ -6,7 +6,7 @@ from pydantic.fields import Field
 from pydantic.types import UUID4
 
 from app.core.config import settings
-from app.utils.daemon_api_wrapper import daemon_api_wrapper_manager
+from app.utils.address_validation import ADDRESS_VALIDATORS
 
 
 class PayoutAddressBase(BaseModel):
@@ -34,11 +34,8 @@ class PayoutAddressCreate(PayoutAddressBase):
         currency_name = values.get('currency_name')
         if not currency_name:
             raise ValueError("Invalid payout address")
-        api_wrapper = daemon_api_wrapper_manager.api_wrappers.get(
-            currency_name)
-        if not api_wrapper:
-            raise ValueError("Invalid payout address")
-        if not api_wrapper.validate_address(v):
+        address_validator = ADDRESS_VALIDATORS.get(currency_name)
+        if address_validator and not address_validator(v):
             raise ValueError("Invalid payout address")
         return v
 
@@ -51,11 +48,8 @@ class PayoutAddressUpdate(PayoutAddressBase):
         currency_name = values.get('currency_name')
         if not currency_name:
             raise ValueError("Invalid payout address")
-        api_wrapper = daemon_api_wrapper_manager.api_wrappers.get(
-            currency_name)
-        if not api_wrapper:
-            raise ValueError("Invalid payout address")
-        if not api_wrapper.validate_address(v):
+        address_validator = ADDRESS_VALIDATORS.get(currency_name)
+        if address_validator and not address_validator(v):
             raise ValueError("Invalid payout address")
         return v
 
@@ -1,4 +1,3 @@
-import secrets
 from typing import Optional, List
 
 from datetime import datetime
@@ -6,6 +5,7 @@ from datetime import datetime
 from pydantic import BaseModel, UUID4, Field, validator, AnyHttpUrl
 
 from app.core.config import settings
+from app.utils.ulid import generate_ulid
 
 
 class PaymentFormBase(BaseModel):
@@ -20,9 +20,7 @@ class PaymentFormBase(BaseModel):
 
 
 class PaymentFormDB(PaymentFormBase):
-    # TODO: I suspect id uniqueness is not checked,
-    #  we should check it, check code properly
-    id: str = Field(default_factory=lambda: secrets.token_urlsafe(16))
+    id: str = Field(default_factory=generate_ulid)
     related_project_id: UUID4
 
 
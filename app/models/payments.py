@@ -37,6 +37,7 @@ class Payment(PaymentBase):
     tx_ids: Optional[List[str]]
     created_on: Optional[datetime]
     status: PaymentStatus
+    confirmations: Optional[int]
     form_id: str
     signature: Optional[str]
 
@@ -50,7 +51,16 @@ class PaymentDB(PaymentBase):
     tx_ids: Optional[List[str]]
     raw_tx_data: Optional[str]
     monero_account_index: Optional[int]
+    monero_address_index: Optional[int]
+    scan_height: Optional[int]
     status: PaymentStatus = PaymentStatus.PENDING
+    # Set when the payment leaves PENDING, stats seeding uses it to tell
+    # transitions it counts from the ones still to be incremented
+    status_changed_on: Optional[datetime]
+    confirmations: Optional[int]
+    # Set once the webhook and payout jobs of a finished payment are
+    # queued, the watcher queues them again for payments left False
+    jobs_dispatched: bool = False
     form_id: str
 
     class Config:
@@ -62,3 +72,4 @@ class PaymentUpdate(BaseModel):
     tx_ids: Optional[List[str]]
     raw_tx_data: Optional[str]
     status: Optional[PaymentStatus]
+    confirmations: Optional[int]
@@ -18,4 +18,14 @@ class PayoutDB(PayoutBase):
 
 
 class Payout(PayoutBase):
+    id: Optional[str]
     created_on: Optional[datetime]
+
+
+class PayoutDetail(Payout):
+    raw_tx_data: Optional[str]
+
+
+class PayoutPage(BaseModel):
+    payouts: List[Payout]
+    next_cursor: Optional[str]
@@ -1,9 +1,11 @@
 import uuid
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
+from decimal import Decimal
 
 from pydantic import BaseModel, validator, AnyHttpUrl, UUID4, Field
 
+from app.constants.payment_status import PaymentStatus
 from app.core.config import settings
 
 
@@ -57,7 +59,12 @@ class ProjectCreateResponse(Project):
     payment_signature_secret: str
 
 
-class ProjectStats(BaseModel):
+class ProjectPaymentStats(BaseModel):
+    payments: Dict[PaymentStatus, int] = {}
+    received: Dict[str, Decimal] = {}
+
+
+class ProjectStats(ProjectPaymentStats):
     total_project: int
     verified_domain: int
     active_project: int
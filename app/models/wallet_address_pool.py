@@ -0,0 +1,10 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class WalletAddressPoolDB(BaseModel):
+    currency_name: str
+    wallet_address: str
+    monero_account_index: Optional[int]
+    monero_address_index: Optional[int]
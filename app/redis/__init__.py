@@ -1,3 +1,5 @@
 from app.redis.manager import RedisManager
+from app.redis.pubsub import RedisPubSubManager
 
 redis_manager = RedisManager()
+pubsub_manager = RedisPubSubManager()
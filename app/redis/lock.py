@@ -0,0 +1,32 @@
+import secrets
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from aioredis import Redis
+
+# Deletes the lock only while it still holds our token, so a holder whose
+# lock already expired can not release the lock of the next holder
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+@asynccontextmanager
+async def redis_lock(
+        redis_client: Redis, name: str, timeout: int) -> AsyncIterator[bool]:
+    """
+        Yields whether the lock was acquired, callers that did not get it
+        are expected to skip their work
+    """
+    token = secrets.token_hex(16)
+    acquired = await redis_client.set(
+        name, token, expire=timeout, exist=redis_client.SET_IF_NOT_EXIST)
+    try:
+        yield bool(acquired)
+    finally:
+        if acquired:
+            await redis_client.eval(
+                RELEASE_LOCK_SCRIPT, keys=[name], args=[token])
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Set, Tuple
+
+import aioredis
+
+from app.core.config import settings
+
+logger = logging.getLogger(settings.LOGGER_NAME)
+
+
+class RedisPubSubManager(object):
+    """
+        Holds one redis subscription per API node and fans the published
+        messages out to the local subscribers of each channel. A dropped
+        connection is reopened, messages published meanwhile are lost so
+        the connect callbacks let subscribers catch up
+    """
+    connection = None
+    listener_task = None
+    patterns: Tuple[str, ...] = ()
+    subscribers: Dict[str, Set[asyncio.Queue]] = {}
+    connect_callbacks: List[Callable[[], None]] = []
+
+    async def connect_to_redis(self, *patterns: str):
+        self.patterns = patterns
+        channels = await self.open_subscription()
+        self.listener_task = asyncio.ensure_future(self.supervise(channels))
+
+    async def disconnect_from_redis(self):
+        logger.info("Disconnecting from redis pubsub...")
+        self.listener_task.cancel()
+        await self.close_connection()
+
+    async def open_subscription(self) -> List[aioredis.Channel]:
+        logger.info("Connecting to redis pubsub...")
+        self.connection = await aioredis.create_redis(
+            f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/1")
+        channels = await self.connection.psubscribe(*self.patterns)
+        for callback in self.connect_callbacks:
+            callback()
+        return channels
+
+    async def close_connection(self):
+        if self.connection and not self.connection.closed:
+            self.connection.close()
+            await self.connection.wait_closed()
+
+    async def supervise(self, channels: List[aioredis.Channel]):
+        while True:
+            try:
+                await asyncio.gather(
+                    *[self.listen(channel) for channel in channels])
+                logger.warning("Redis pubsub connection lost")
+            except Exception as e:
+                logger.error(f"Redis pubsub listener failed: {e}")
+            await self.close_connection()
+            while True:
+                await asyncio.sleep(settings.REDIS_PUBSUB_RECONNECT_DELAY)
+                try:
+                    channels = await self.open_subscription()
+                    break
+                except Exception as e:
+                    logger.error(f"Reconnecting to redis pubsub failed: {e}")
+            logger.info("Reconnected to redis pubsub")
+
+    async def listen(self, channel: aioredis.Channel):
+        while await channel.wait_message():
+            channel_name, message = await channel.get(encoding='utf-8')
+            for queue in self.subscribers.get(channel_name.decode(), ()):
+                queue.put_nowait(message)
+
+    def add_connect_callback(self, callback: Callable[[], None]):
+        self.connect_callbacks.append(callback)
+
+    def remove_connect_callback(self, callback: Callable[[], None]):
+        if callback in self.connect_callbacks:
+            self.connect_callbacks.remove(callback)
+
+    @asynccontextmanager
+    async def subscribe(
+            self, channel_name: str) -> AsyncIterator[asyncio.Queue]:
+        queue: asyncio.Queue = asyncio.Queue()
+        self.subscribers.setdefault(channel_name, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            self.subscribers[channel_name].discard(queue)
+            if not self.subscribers[channel_name]:
+                del self.subscribers[channel_name]
@@ -0,0 +1,278 @@
+import hashlib
+from typing import List, Optional, Tuple
+
+BASE58_ALPHABET = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+BECH32_CHARSET = 'qpzry9x8gf2tvdw0s3jn54khce6mua7l'
+BECH32_CONST = 1
+BECH32M_CONST = 0x2bc830a3
+# Encoded length of a cryptonote base58 block indexed by its byte length
+CRYPTONOTE_ENCODED_BLOCK_SIZES = [0, 2, 3, 5, 6, 7, 9, 10, 11]
+
+# RIPEMD-160 message word order, rotations and constants for the left and
+# right lines
+RIPEMD160_ML = [
+    0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15,
+    7, 4, 13, 1, 10, 6, 15, 3, 12, 0, 9, 5, 2, 14, 11, 8,
+    3, 10, 14, 4, 9, 15, 8, 1, 2, 7, 0, 6, 13, 11, 5, 12,
+    1, 9, 11, 10, 0, 8, 12, 4, 13, 3, 7, 15, 14, 5, 6, 2,
+    4, 0, 5, 9, 7, 12, 2, 10, 14, 1, 3, 8, 11, 6, 15, 13
+]
+RIPEMD160_MR = [
+    5, 14, 7, 0, 9, 2, 11, 4, 13, 6, 15, 8, 1, 10, 3, 12,
+    6, 11, 3, 7, 0, 13, 5, 10, 14, 15, 8, 12, 4, 9, 1, 2,
+    15, 5, 1, 3, 7, 14, 6, 9, 11, 8, 12, 2, 10, 0, 4, 13,
+    8, 6, 4, 1, 3, 11, 15, 0, 5, 12, 2, 13, 9, 7, 10, 14,
+    12, 15, 10, 4, 1, 5, 8, 7, 6, 2, 13, 14, 0, 3, 9, 11
+]
+RIPEMD160_RL = [
+    11, 14, 15, 12, 5, 8, 7, 9, 11, 13, 14, 15, 6, 7, 9, 8,
+    7, 6, 8, 13, 11, 9, 7, 15, 7, 12, 15, 9, 11, 7, 13, 12,
+    11, 13, 6, 7, 14, 9, 13, 15, 14, 8, 13, 6, 5, 12, 7, 5,
+    11, 12, 14, 15, 14, 15, 9, 8, 9, 14, 5, 6, 8, 6, 5, 12,
+    9, 15, 5, 11, 6, 8, 13, 12, 5, 12, 13, 14, 11, 8, 5, 6
+]
+RIPEMD160_RR = [
+    8, 9, 9, 11, 13, 15, 15, 5, 7, 7, 8, 11, 14, 14, 12, 6,
+    9, 13, 15, 7, 12, 8, 9, 11, 7, 7, 12, 7, 6, 15, 13, 11,
+    9, 7, 15, 11, 8, 6, 6, 14, 12, 13, 5, 14, 13, 13, 7, 5,
+    15, 5, 8, 11, 14, 14, 6, 14, 6, 9, 12, 9, 12, 5, 15, 8,
+    8, 5, 12, 9, 12, 5, 14, 6, 8, 13, 6, 5, 15, 13, 11, 11
+]
+RIPEMD160_KL = [0x00000000, 0x5a827999, 0x6ed9eba1, 0x8f1bbcdc, 0xa953fd4e]
+RIPEMD160_KR = [0x50a28be6, 0x5c4dd124, 0x6d703ef3, 0x7a6d76e9, 0x00000000]
+
+
+def _ripemd160_f(x: int, y: int, z: int, i: int) -> int:
+    if i == 0:
+        return x ^ y ^ z
+    if i == 1:
+        return (x & y) | (~x & z)
+    if i == 2:
+        return (x | ~y) ^ z
+    if i == 3:
+        return (x & z) | (y & ~z)
+    return x ^ (y | ~z)
+
+
+def _rotate_left(x: int, i: int) -> int:
+    return ((x << i) | ((x & 0xffffffff) >> (32 - i))) & 0xffffffff
+
+
+def _ripemd160_compress(h0, h1, h2, h3, h4, block: bytes):
+    al, bl, cl, dl, el = h0, h1, h2, h3, h4
+    ar, br, cr, dr, er = h0, h1, h2, h3, h4
+    x = [
+        int.from_bytes(block[4 * i:4 * (i + 1)], 'little')
+        for i in range(16)
+    ]
+    for j in range(80):
+        rnd = j >> 4
+        al = _rotate_left(
+            al + _ripemd160_f(bl, cl, dl, rnd)
+            + x[RIPEMD160_ML[j]] + RIPEMD160_KL[rnd],
+            RIPEMD160_RL[j]) + el
+        al, bl, cl, dl, el = el, al, bl, _rotate_left(cl, 10), dl
+        ar = _rotate_left(
+            ar + _ripemd160_f(br, cr, dr, 4 - rnd)
+            + x[RIPEMD160_MR[j]] + RIPEMD160_KR[rnd],
+            RIPEMD160_RR[j]) + er
+        ar, br, cr, dr, er = er, ar, br, _rotate_left(cr, 10), dr
+    return (
+        h1 + cl + dr, h2 + dl + er, h3 + el + ar, h4 + al + br, h0 + bl + cr
+    )
+
+
+def _ripemd160(data: bytes) -> bytes:
+    state = (0x67452301, 0xefcdab89, 0x98badcfe, 0x10325476, 0xc3d2e1f0)
+    for i in range(len(data) >> 6):
+        state = _ripemd160_compress(*state, data[64 * i:64 * (i + 1)])
+    padding = b'\x80' + b'\x00' * ((119 - len(data)) & 63)
+    tail = data[len(data) & ~63:] + padding \
+        + (8 * len(data)).to_bytes(8, 'little')
+    for i in range(len(tail) >> 6):
+        state = _ripemd160_compress(*state, tail[64 * i:64 * (i + 1)])
+    return b''.join((h & 0xffffffff).to_bytes(4, 'little') for h in state)
+
+
+def ripemd160(data: bytes) -> bytes:
+    """
+        OpenSSL 3 builds of hashlib may not provide ripemd160, the pure
+        python version is used then
+    """
+    try:
+        return hashlib.new('ripemd160', data).digest()
+    except ValueError:
+        return _ripemd160(data)
+
+
+def sha256d(data: bytes) -> bytes:
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+
+def hash160(data: bytes) -> bytes:
+    return ripemd160(hashlib.sha256(data).digest())
+
+
+def base58_encode(data: bytes) -> str:
+    number = int.from_bytes(data, 'big')
+    encoded = ''
+    while number:
+        number, remainder = divmod(number, 58)
+        encoded = BASE58_ALPHABET[remainder] + encoded
+    leading_zeros = len(data) - len(data.lstrip(b'\x00'))
+    return BASE58_ALPHABET[0] * leading_zeros + encoded
+
+
+def base58_decode(encoded: str) -> bytes:
+    number = 0
+    for char in encoded:
+        index = BASE58_ALPHABET.find(char)
+        if index == -1:
+            raise ValueError(f'Invalid base58 character {char!r}')
+        number = number * 58 + index
+    leading_zeros = len(encoded) - len(encoded.lstrip(BASE58_ALPHABET[0]))
+    return b'\x00' * leading_zeros \
+        + number.to_bytes((number.bit_length() + 7) // 8, 'big')
+
+
+def base58check_encode(payload: bytes) -> str:
+    return base58_encode(payload + sha256d(payload)[:4])
+
+
+def base58check_decode(encoded: str) -> bytes:
+    data = base58_decode(encoded)
+    payload, checksum = data[:-4], data[-4:]
+    if len(data) < 4 or sha256d(payload)[:4] != checksum:
+        raise ValueError('Invalid base58 checksum')
+    return payload
+
+
+def bech32_polymod(values: List[int]) -> int:
+    generator = [0x3b6a57b2, 0x26508e6d, 0x1ea119fa, 0x3d4233dd, 0x2a1462b3]
+    checksum = 1
+    for value in values:
+        top = checksum >> 25
+        checksum = (checksum & 0x1ffffff) << 5 ^ value
+        for i in range(5):
+            checksum ^= generator[i] if ((top >> i) & 1) else 0
+    return checksum
+
+
+def bech32_hrp_expand(hrp: str) -> List[int]:
+    return [ord(x) >> 5 for x in hrp] + [0] + [ord(x) & 31 for x in hrp]
+
+
+def bech32_encode(hrp: str, data: List[int], const: int) -> str:
+    polymod = bech32_polymod(
+        bech32_hrp_expand(hrp) + data + [0] * 6) ^ const
+    checksum = [(polymod >> 5 * (5 - i)) & 31 for i in range(6)]
+    return hrp + '1' + ''.join(BECH32_CHARSET[d] for d in data + checksum)
+
+
+def bech32_decode(
+        bech: str) -> Tuple[Optional[str], Optional[List[int]], int]:
+    if any(ord(x) < 33 or ord(x) > 126 for x in bech) \
+            or (bech.lower() != bech and bech.upper() != bech):
+        return (None, None, 0)
+    bech = bech.lower()
+    pos = bech.rfind('1')
+    if pos < 1 or pos + 7 > len(bech) or len(bech) > 90:
+        return (None, None, 0)
+    if not all(x in BECH32_CHARSET for x in bech[pos + 1:]):
+        return (None, None, 0)
+    hrp = bech[:pos]
+    data = [BECH32_CHARSET.find(x) for x in bech[pos + 1:]]
+    const = bech32_polymod(bech32_hrp_expand(hrp) + data)
+    if const not in (BECH32_CONST, BECH32M_CONST):
+        return (None, None, 0)
+    return (hrp, data[:-6], const)
+
+
+def convert_bits(
+        data: bytes, from_bits: int, to_bits: int,
+        pad: bool = True) -> List[int]:
+    acc = 0
+    bits = 0
+    converted = []
+    max_value = (1 << to_bits) - 1
+    for value in data:
+        if value < 0 or value >> from_bits:
+            raise ValueError('Invalid value for bit conversion')
+        acc = (acc << from_bits) | value
+        bits += from_bits
+        while bits >= to_bits:
+            bits -= to_bits
+            converted.append((acc >> bits) & max_value)
+    if pad:
+        if bits:
+            converted.append((acc << (to_bits - bits)) & max_value)
+    elif bits >= from_bits or ((acc << (to_bits - bits)) & max_value):
+        raise ValueError('Invalid padding in bit conversion')
+    return converted
+
+
+def encode_segwit_address(
+        hrp: str, witness_version: int, witness_program: bytes) -> str:
+    return bech32_encode(
+        hrp,
+        [witness_version] + convert_bits(witness_program, 8, 5),
+        BECH32_CONST if witness_version == 0 else BECH32M_CONST
+    )
+
+
+def decode_segwit_address(
+        hrp: str, address: str) -> Tuple[Optional[int], Optional[bytes]]:
+    """
+        BIP173 and BIP350 decoding, version 0 programs need the bech32
+        checksum and later versions the bech32m one
+    """
+    decoded_hrp, data, const = bech32_decode(address)
+    if decoded_hrp != hrp or not data:
+        return (None, None)
+    try:
+        witness_program = bytes(convert_bits(data[1:], 5, 8, False))
+    except ValueError:
+        return (None, None)
+    witness_version = data[0]
+    if witness_version > 16 or not 2 <= len(witness_program) <= 40:
+        return (None, None)
+    if witness_version == 0 and len(witness_program) not in (20, 32):
+        return (None, None)
+    if const != (BECH32_CONST if witness_version == 0 else BECH32M_CONST):
+        return (None, None)
+    return (witness_version, witness_program)
+
+
+def cryptonote_base58_decode(encoded: str) -> bytes:
+    """
+        Cryptonote base58 encodes 8 byte blocks into 11 characters each,
+        only the last block can be shorter
+    """
+    decoded = b''
+    for offset in range(0, len(encoded), 11):
+        block = encoded[offset:offset + 11]
+        if len(block) not in CRYPTONOTE_ENCODED_BLOCK_SIZES:
+            raise ValueError('Invalid cryptonote base58 block size')
+        size = CRYPTONOTE_ENCODED_BLOCK_SIZES.index(len(block))
+        number = 0
+        for char in block:
+            index = BASE58_ALPHABET.find(char)
+            if index == -1:
+                raise ValueError(f'Invalid base58 character {char!r}')
+            number = number * 58 + index
+        if number >> (8 * size):
+            raise ValueError('Cryptonote base58 block overflow')
+        decoded += number.to_bytes(size, 'big')
+    return decoded
+
+
+def read_varint(data: bytes) -> Tuple[int, int]:
+    """
+        Returns the decoded varint and the number of bytes it used
+    """
+    value = 0
+    for i, byte in enumerate(data[:10]):
+        value |= (byte & 0x7f) << (7 * i)
+        if not byte & 0x80:
+            return (value, i + 1)
+    raise ValueError('Invalid varint')
@@ -0,0 +1,84 @@
+from typing import Dict, Optional, Set
+
+from app.core.config import settings
+from app.constants.address import ADDRESS_NETWORKS
+from app.utils.address_encoding import (
+    base58check_decode, cryptonote_base58_decode, decode_segwit_address,
+    read_varint)
+from app.utils.keccak import keccak_256
+
+
+def is_valid_base58_address(address: str, versions: Set[int]) -> bool:
+    try:
+        payload = base58check_decode(address)
+    except ValueError:
+        return False
+    return len(payload) == 21 and payload[0] in versions
+
+
+def is_valid_segwit_address(address: str, hrps: Set[str]) -> bool:
+    hrp = address.lower().rpartition('1')[0]
+    if hrp not in hrps:
+        return False
+    witness_version, _ = decode_segwit_address(hrp, address)
+    return witness_version is not None
+
+
+def is_valid_cryptonote_address(
+        address: str, prefixes: Optional[Set[int]]) -> bool:
+    """
+        Checks the keccak checksum, the network prefix and that the
+        address holds a spend and a view key with an optional payment id
+    """
+    try:
+        data = cryptonote_base58_decode(address)
+        prefix, prefix_length = read_varint(data)
+    except ValueError:
+        return False
+    payload, checksum = data[:-4], data[-4:]
+    if prefixes is not None and prefix not in prefixes:
+        return False
+    if len(payload) - prefix_length not in (64, 72):
+        return False
+    return keccak_256(payload)[:4] == checksum
+
+
+def get_address_network(currency_name: str) -> Dict:
+    """
+        The settings make sure the network of every allowed currency is
+        in ADDRESS_NETWORKS
+    """
+    network = getattr(settings, f'{currency_name.upper()}_NETWORK') \
+        or settings.CRYPTO_NETWORK
+    return ADDRESS_NETWORKS[currency_name][network]
+
+
+def is_valid_bitcoin_address(address: str) -> bool:
+    network = get_address_network('bitcoin')
+    return is_valid_base58_address(address, network['base58_versions']) \
+        or is_valid_segwit_address(address, network['bech32_hrps'])
+
+
+def is_valid_dogecoin_address(address: str) -> bool:
+    return is_valid_base58_address(
+        address, get_address_network('dogecoin')['base58_versions'])
+
+
+def is_valid_monero_address(address: str) -> bool:
+    return is_valid_cryptonote_address(
+        address, get_address_network('monero')['cryptonote_prefixes'])
+
+
+def is_valid_baza_address(address: str) -> bool:
+    return is_valid_cryptonote_address(
+        address,
+        {settings.BAZA_ADDRESS_PREFIX}
+        if settings.BAZA_ADDRESS_PREFIX is not None else None)
+
+
+ADDRESS_VALIDATORS = {
+    'bitcoin': is_valid_bitcoin_address,
+    'dogecoin': is_valid_dogecoin_address,
+    'monero': is_valid_monero_address,
+    'baza': is_valid_baza_address
+}
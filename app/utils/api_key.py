@@ -1,14 +1,89 @@
-from typing import Tuple
+import hashlib
+import hmac
+import time
+from typing import Dict, Tuple
+
 from passlib.context import CryptContext
+from pydantic import UUID4
 
+from app.core.config import settings
+from app.redis import redis_manager
+from app.utils.hashing import hashing_executor
 
 api_key_ctx = CryptContext(schemes=['bcrypt'], deprecated='auto')
 
+VERIFIED_API_KEYS_PREFIX = 'verified_api_keys:'
+
 
-def verify_and_update_api_key(
+async def verify_and_update_api_key(
         plain_api_key: str, hashed_api_key: str) -> Tuple[bool, str]:
-    return api_key_ctx.verify_and_update(plain_api_key, hashed_api_key)
+    return await hashing_executor.run(
+        api_key_ctx.verify_and_update, plain_api_key, hashed_api_key)
+
+
+async def hash_api_key(plain_api_key: str) -> str:
+    return await hashing_executor.run(api_key_ctx.hash, plain_api_key)
+
+
+def get_api_key_fingerprint(plain_api_key: str, hashed_api_key: str) -> str:
+    """
+        The stored hash is part of the fingerprint so that a rotated key
+        never matches a fingerprint cached for the old one
+    """
+    return hmac.new(
+        settings.SECRET_KEY.encode(),
+        f'{hashed_api_key}:{plain_api_key}'.encode(),
+        hashlib.sha256
+    ).hexdigest()
+
+
+class VerifiedAPIKeyCache(object):
+    verified: Dict[str, Dict[str, float]] = {}
+
+    def remember(self, project_id: str, fingerprint: str):
+        now = time.monotonic()
+        fingerprints = {
+            cached_fingerprint: expires_on
+            for cached_fingerprint, expires_on
+            in self.verified.get(project_id, {}).items()
+            if expires_on > now
+        }
+        fingerprints[fingerprint] = now + settings.API_KEY_CACHE_TTL
+        self.verified[project_id] = fingerprints
+
+    async def is_verified(
+            self, project_id: UUID4,
+            plain_api_key: str, hashed_api_key: str) -> bool:
+        project_id = str(project_id)
+        fingerprint = get_api_key_fingerprint(plain_api_key, hashed_api_key)
+        expires_on = self.verified.get(project_id, {}).get(fingerprint, 0)
+        if expires_on > time.monotonic():
+            return True
+        if await redis_manager.redis_client.sismember(
+                f'{VERIFIED_API_KEYS_PREFIX}{project_id}', fingerprint):
+            self.remember(project_id, fingerprint)
+            return True
+        return False
+
+    async def add(
+            self, project_id: UUID4,
+            plain_api_key: str, hashed_api_key: str):
+        project_id = str(project_id)
+        fingerprint = get_api_key_fingerprint(plain_api_key, hashed_api_key)
+        self.remember(project_id, fingerprint)
+        transaction = redis_manager.redis_client.multi_exec()
+        transaction.sadd(
+            f'{VERIFIED_API_KEYS_PREFIX}{project_id}', fingerprint)
+        transaction.expire(
+            f'{VERIFIED_API_KEYS_PREFIX}{project_id}',
+            settings.API_KEY_CACHE_TTL)
+        await transaction.execute()
+
+    async def invalidate(self, project_id: UUID4):
+        project_id = str(project_id)
+        self.verified.pop(project_id, None)
+        await redis_manager.redis_client.delete(
+            f'{VERIFIED_API_KEYS_PREFIX}{project_id}')
 
 
-def hash_api_key(plain_api_key: str) -> str:
-    return api_key_ctx.hash(plain_api_key)
+verified_api_key_cache = VerifiedAPIKeyCache()
@@ -1,9 +1,11 @@
 from pathlib import Path
+from motor.motor_asyncio import AsyncIOMotorDatabase
 from passlib.context import CryptContext
 
 from app.models.users import UserDB
 from app.core.config import settings
 from app.utils.common import send_email
+from app.utils.hashing import hashing_executor
 
 
 password_ctx = CryptContext(
@@ -42,8 +44,18 @@ def send_forgot_password_email(user: UserDB, token: str):
     )
 
 
-def verify_user_password(password: str, user: UserDB):
-    return password_ctx.verify(password, user.hashed_password)
+async def verify_user_password(
+        db: AsyncIOMotorDatabase, password: str, user: UserDB) -> bool:
+    """
+        The hash is read from the database, users resolved from access
+        tokens are cached without it
+    """
+    stored_user = await db.users.find_one(
+        {'id': user.id}, {'hashed_password': True})
+    if not stored_user:
+        return False
+    return await hashing_executor.run(
+        password_ctx.verify, password, stored_user['hashed_password'])
 
 
 def send_two_factor_email(user: UserDB, enabled: bool):
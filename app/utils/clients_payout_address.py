@@ -0,0 +1,30 @@
+from typing import Union
+
+from starlette.exceptions import HTTPException
+from starlette import status
+
+from app.core.config import settings
+from app.models.clients_payout_address import (
+    PayoutAddressCreate, PayoutAddressUpdate)
+from app.utils.address_validation import ADDRESS_VALIDATORS
+from app.utils.daemon_api_wrapper import daemon_api_wrapper_manager
+
+
+async def check_payout_address_valid(
+        payout_address_data: Union[PayoutAddressCreate, PayoutAddressUpdate]):
+    """
+        The address is already validated offline by the model, the daemon
+        is only asked for currencies without an offline validator or when
+        PAYOUT_ADDRESS_DAEMON_VALIDATION is set
+    """
+    if payout_address_data.currency_name in ADDRESS_VALIDATORS \
+            and not settings.PAYOUT_ADDRESS_DAEMON_VALIDATION:
+        return
+    api_wrapper = daemon_api_wrapper_manager.api_wrappers.get(
+        payout_address_data.currency_name)
+    if not api_wrapper or not await api_wrapper.validate_address(
+            payout_address_data.payout_address):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Invalid payout address'
+        )
@@ -0,0 +1,82 @@
+import asyncio
+import json
+import time
+from decimal import Decimal
+from typing import Dict, Optional
+
+from aioredis import Redis
+
+from app.core.config import settings
+
+CURRENCY_PRICES_KEY = 'currency_prices'
+CURRENCY_PRICES_VERSION_KEY = 'currency_prices:version'
+
+
+async def store_currency_prices(
+        redis_client: Redis, currency_prices: Dict[str, Dict]) -> None:
+    """
+        Merges the given fiat prices into the stored ones and bumps the
+        version in one transaction, currencies and fiat prices not given
+        keep their stored values
+    """
+    if not currency_prices:
+        return
+    currency_names = list(currency_prices)
+    stored_prices = await redis_client.hmget(
+        CURRENCY_PRICES_KEY, *currency_names, encoding='utf-8')
+    transaction = redis_client.multi_exec()
+    transaction.hmset_dict(
+        CURRENCY_PRICES_KEY,
+        {
+            currency_name: json.dumps({
+                **(json.loads(stored) if stored else {}),
+                **currency_prices[currency_name]
+            })
+            for currency_name, stored in zip(currency_names, stored_prices)
+        }
+    )
+    transaction.incr(CURRENCY_PRICES_VERSION_KEY)
+    await transaction.execute()
+
+
+class CurrencyPriceCache(object):
+    prices: Dict[str, Dict[str, Decimal]] = {}
+    version: Optional[str] = None
+    checked_on: float = 0
+    revalidation: Optional[asyncio.Future] = None
+
+    async def revalidate(self, redis_client: Redis):
+        version = await redis_client.get(
+            CURRENCY_PRICES_VERSION_KEY, encoding='utf-8')
+        if version != self.version:
+            currency_prices = await redis_client.hgetall(
+                CURRENCY_PRICES_KEY, encoding='utf-8')
+            self.prices = {
+                currency_name: json.loads(prices, parse_float=Decimal)
+                for currency_name, prices in currency_prices.items()
+            }
+            self.version = version
+        self.checked_on = time.monotonic()
+
+    async def get_prices(
+            self, redis_client: Redis) -> Dict[str, Dict[str, Decimal]]:
+        """
+            Serves the prices from memory and only checks the stored version
+            once CURRENCY_PRICE_CACHE_TTL passed, concurrent callers share a
+            single revalidation
+        """
+        if time.monotonic() - self.checked_on \
+                > settings.CURRENCY_PRICE_CACHE_TTL:
+            if not self.revalidation:
+                self.revalidation = asyncio.ensure_future(
+                    self.revalidate(redis_client))
+                self.revalidation.add_done_callback(
+                    self.clear_revalidation)
+            await asyncio.shield(self.revalidation)
+        return self.prices
+
+    def clear_revalidation(self, _: asyncio.Future):
+        self.revalidation = None
+
+
+currency_price_cache = CurrencyPriceCache()
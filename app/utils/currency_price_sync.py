@@ -0,0 +1,153 @@
+import asyncio
+import logging
+from functools import partial
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+from aioredis import Redis
+
+from app.core.config import settings
+from app.constants.currency_price import (
+    COINGECKO_SIMPLE_PRICE_URL, CRYPTOCOMPARE_PRICE_MULTI_URL,
+    SOUTHXCHANGE_BAZA_PRICE_URL, CURRENCY_SYMBOLS)
+from app.utils.currency_price import store_currency_prices
+
+logger = logging.getLogger(settings.LOGGER_NAME)
+
+PriceFetcher = Callable[[], Awaitable[Dict[str, Dict]]]
+
+
+async def fetch_coingecko_prices(
+        client: httpx.AsyncClient, currency_names: List[str],
+        fiat_currencies: List[str]) -> Dict[str, Dict]:
+    res = await client.get(
+        COINGECKO_SIMPLE_PRICE_URL,
+        params={
+            'ids': ','.join(currency_names),
+            'vs_currencies': ','.join(fiat_currencies)
+        }
+    )
+    res.raise_for_status()
+    prices = res.json()
+    return {
+        currency_name: prices[currency_name]
+        for currency_name in currency_names if prices.get(currency_name)
+    }
+
+
+async def fetch_cryptocompare_prices(
+        client: httpx.AsyncClient, currency_names: List[str],
+        fiat_currencies: List[str]) -> Dict[str, Dict]:
+    symbols = {
+        CURRENCY_SYMBOLS[currency_name]: currency_name
+        for currency_name in currency_names
+        if currency_name in CURRENCY_SYMBOLS
+    }
+    res = await client.get(
+        CRYPTOCOMPARE_PRICE_MULTI_URL,
+        params={
+            'fsyms': ','.join(symbols),
+            'tsyms': ','.join(fiat.upper() for fiat in fiat_currencies)
+        }
+    )
+    res.raise_for_status()
+    return {
+        symbols[symbol]: {
+            fiat.lower(): price for fiat, price in prices.items()
+        }
+        for symbol, prices in res.json().items() if symbol in symbols
+    }
+
+
+async def fetch_southxchange_prices(
+        client: httpx.AsyncClient) -> Dict[str, Dict]:
+    res = await client.get(SOUTHXCHANGE_BAZA_PRICE_URL)
+    res.raise_for_status()
+    return {'baza': {'usd': res.json()['Last']}}
+
+
+async def fetch_hedged(fetchers: List[PriceFetcher]) -> Dict[str, Dict]:
+    """
+        Starts the next provider when the running ones failed or did not
+        answer within PRICE_SYNC_HEDGE_DELAY, the first non empty answer
+        wins and the other requests are cancelled
+    """
+    remaining = list(fetchers)
+    pending = set()
+    try:
+        while remaining or pending:
+            if remaining:
+                pending.add(asyncio.ensure_future(remaining.pop(0)()))
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=settings.PRICE_SYNC_HEDGE_DELAY if remaining else None,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                if task.exception():
+                    logger.warning(
+                        f"Fetching currency prices failed: "
+                        f"{task.exception()!r}")
+                elif task.result():
+                    return task.result()
+        return {}
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def add_cross_rates(
+        currency_prices: Dict[str, Dict], fiat_currencies: List[str]) -> None:
+    """
+        Baza is only priced in usd, its other fiat prices are derived from
+        the usd cross rates of bitcoin. Without bitcoin prices baza keeps
+        its last stored prices in the other fiat currencies
+    """
+    baza_prices = currency_prices.get('baza')
+    bitcoin_prices = currency_prices.get('bitcoin', {})
+    if not baza_prices or not bitcoin_prices.get('usd'):
+        return
+    for fiat in fiat_currencies:
+        if fiat not in baza_prices and bitcoin_prices.get(fiat):
+            baza_prices[fiat] = baza_prices['usd'] \
+                * bitcoin_prices[fiat] / bitcoin_prices['usd']
+
+
+async def sync_currency_prices(redis_client: Redis) -> Dict[str, Dict]:
+    """
+        Fetches every currency's prices in all allowed fiat currencies
+        concurrently and stores the ones received, currencies no provider
+        answered for keep their last stored prices
+    """
+    fiat_currencies = [
+        fiat.lower() for fiat in settings.ALLOWED_FIAT_CURRENCY]
+    currency_names = [
+        currency_name for currency_name in settings.ALLOWED_CURRENCY_NAME
+        if currency_name != 'baza'
+    ]
+    if 'baza' in settings.ALLOWED_CURRENCY_NAME \
+            and 'bitcoin' not in currency_names:
+        currency_names.append('bitcoin')
+    async with httpx.AsyncClient(
+            timeout=settings.PRICE_SYNC_TIMEOUT) as client:
+        fetches = []
+        if currency_names:
+            fetches.append(fetch_hedged([
+                partial(
+                    fetch_coingecko_prices,
+                    client, currency_names, fiat_currencies),
+                partial(
+                    fetch_cryptocompare_prices,
+                    client, currency_names, fiat_currencies)
+            ]))
+        if 'baza' in settings.ALLOWED_CURRENCY_NAME:
+            fetches.append(fetch_hedged([
+                partial(fetch_southxchange_prices, client)
+            ]))
+        results = await asyncio.gather(*fetches)
+    currency_prices = {}
+    for result in results:
+        currency_prices.update(result)
+    add_cross_rates(currency_prices, fiat_currencies)
+    await store_currency_prices(redis_client, currency_prices)
+    return currency_prices
@@ -14,7 +14,7 @@ logger = logging.getLogger(settings.LOGGER_NAME)
 class DaemonApiWrapperManager(object):
     api_wrappers: Dict = {}
 
-    def initialize_api_wrappers(self):
+    async def initialize_api_wrappers(self):
         if 'bitcoin' in settings.ALLOWED_CURRENCY_NAME:
             logger.info("Creating bitcoin wrapper")
             self.api_wrappers['bitcoin'] = BitcoinAPIWrapper(
@@ -22,7 +22,7 @@ class DaemonApiWrapperManager(object):
                 settings.BITCOIN_WALLET_RPC_USERNAME,
                 settings.BITCOIN_WALLET_RPC_PASSWORD
             )
-            self.api_wrappers['bitcoin'].check_wallet_loaded()
+            await self.api_wrappers['bitcoin'].check_wallet_loaded()
         if 'dogecoin' in settings.ALLOWED_CURRENCY_NAME:
             logger.info("Creating dogecoin wrapper")
             self.api_wrappers['dogecoin'] = DogeCoinAPIWrapper(
@@ -30,7 +30,7 @@ class DaemonApiWrapperManager(object):
                 settings.DOGECOIN_WALLET_RPC_USERNAME,
                 settings.DOGECOIN_WALLET_RPC_PASSWORD
             )
-            self.api_wrappers['dogecoin'].check_wallet_loaded()
+            await self.api_wrappers['dogecoin'].check_wallet_loaded()
         if 'monero' in settings.ALLOWED_CURRENCY_NAME:
             logger.info("Creating monero wrapper")
             self.api_wrappers['monero'] = MoneroAPIWrapper(
@@ -38,17 +38,22 @@ class DaemonApiWrapperManager(object):
                 settings.MONERO_WALLET_RPC_USERNAME,
                 settings.MONERO_WALLET_RPC_PASSWORD
             )
-            self.api_wrappers['monero'].check_wallet_loaded()
+            await self.api_wrappers['monero'].check_wallet_loaded()
         if 'baza' in settings.ALLOWED_CURRENCY_NAME:
             logger.info("Creating baza wrapper")
             self.api_wrappers['baza'] = BazaAPIWrapper()
-            res = self.api_wrappers['baza'].open_wallet()
+            res = await self.api_wrappers['baza'].open_wallet()
             if res.status_code == 403:
                 self.api_wrappers['baza'].wallet_is_open = True
             if res.status_code == 400 and res.json()['errorCode'] == 1:
-                res = self.api_wrappers['baza'].create_wallet()
+                res = await self.api_wrappers['baza'].create_wallet()
             if res.status_code == 200:
                 self.api_wrappers['baza'].wallet_is_open = True
+            self.api_wrappers['baza'].start_background_tasks()
+
+    async def close_api_wrappers(self):
+        for api_wrapper in self.api_wrappers.values():
+            await api_wrapper.close()
 
 
 daemon_api_wrapper_manager = DaemonApiWrapperManager()
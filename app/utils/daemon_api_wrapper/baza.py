@@ -1,8 +1,15 @@
+import asyncio
+import logging
+import time
 from typing import Dict, List, Optional
 from decimal import Decimal
-import requests
+
+import httpx
 
 from app.core.config import settings
+from app.utils.daemon_api_wrapper.http_client import create_http_client
+
+logger = logging.getLogger(settings.LOGGER_NAME)
 
 ATOMIC = Decimal('0.000001')
 
@@ -26,92 +33,173 @@ data = {
 class BazaAPIWrapper(object):
     def __init__(self) -> None:
         self.wallet_is_open = False
-
-    def get_request_function(self, req_method):
-        if req_method == 'POST':
-            return requests.post
-        if req_method == 'DELETE':
-            return requests.delete
-        if req_method == 'PUT':
-            return requests.put
-        return requests.get
-
-    def get_api_response(self, req_method, api_endpoint, data=None):
+        self.client: httpx.AsyncClient = create_http_client(
+            headers={'X-API-KEY': settings.BAZA_WALLET_API_KEY})
+        self.status: Optional[Dict] = None
+        self.status_updated_on: float = 0
+        self.status_refresh_task: Optional[asyncio.Task] = None
+        self.unsaved_changes = 0
+        self.save_requested = asyncio.Event()
+        self.save_lock = asyncio.Lock()
+        self.save_task: Optional[asyncio.Task] = None
+
+    def start_background_tasks(self):
+        self.status_refresh_task = asyncio.create_task(
+            self.refresh_status_forever())
+        self.save_task = asyncio.create_task(self.save_wallet_forever())
+
+    async def close(self):
+        tasks = [
+            task for task in (self.status_refresh_task, self.save_task)
+            if task
+        ]
+        for task in tasks:
+            task.cancel()
+        # A save cancelled midway has put its changes back by the time
+        # the task finishes, so the flush below still sees them
+        await asyncio.gather(*tasks, return_exceptions=True)
+        try:
+            await self.flush_wallet_saves()
+        except httpx.HTTPError as e:
+            logger.warning(f"Saving baza wallet on close failed: {e!r}")
+        await self.client.aclose()
+
+    async def get_api_response(
+            self, req_method, api_endpoint, data=None) -> httpx.Response:
         url = settings.BAZA_WALLET_API_URL + api_endpoint
-        headers = {
-            'X-API-KEY': settings.BAZA_WALLET_API_KEY
-        }
-        request_function = self.get_request_function(req_method)
         if data:
-            return request_function(url, headers=headers, json=data)
-        return request_function(url, headers=headers)
-
-    def get_wallet_status(self):
-        return self.get_api_response('GET', '/status')
-
-    def open_wallet(self):
-        return self.get_api_response('POST', '/wallet/open', data)
-
-    def create_wallet(self):
-        return self.get_api_response('POST', '/wallet/create', data)
-
-    def close_wallet(self):
-        return self.get_api_response('DELETE', '/wallet')
-
-    def save_wallet(self):
-        return self.get_api_response('PUT', '/save')
-
-    def refresh_wallet(self):
-        self.get_api_response(
+            return await self.client.request(req_method, url, json=data)
+        return await self.client.request(req_method, url)
+
+    async def get_wallet_status(self):
+        return await self.get_api_response('GET', '/status')
+
+    async def refresh_status(self) -> Optional[Dict]:
+        res = await self.get_wallet_status()
+        self.status = res.json() if res.status_code == 200 else None
+        self.status_updated_on = time.monotonic()
+        return self.status
+
+    async def refresh_status_forever(self):
+        while True:
+            try:
+                await self.refresh_status()
+            except httpx.HTTPError as e:
+                self.status = None
+                logger.warning(f"Refreshing baza wallet status failed: {e!r}")
+            await asyncio.sleep(settings.BAZA_STATUS_REFRESH_INTERVAL)
+
+    async def get_status(self) -> Optional[Dict]:
+        """
+            Returns the status snapshot kept by the refresh task, the
+            status is only fetched inline when the snapshot went stale
+        """
+        if time.monotonic() - self.status_updated_on \
+                > settings.BAZA_STATUS_TTL:
+            return await self.refresh_status()
+        return self.status
+
+    async def open_wallet(self):
+        return await self.get_api_response('POST', '/wallet/open', data)
+
+    async def create_wallet(self):
+        return await self.get_api_response('POST', '/wallet/create', data)
+
+    async def close_wallet(self):
+        return await self.get_api_response('DELETE', '/wallet')
+
+    async def save_wallet(self):
+        return await self.get_api_response('PUT', '/save')
+
+    def mark_wallet_unsaved(self):
+        self.unsaved_changes += 1
+        if self.unsaved_changes >= settings.BAZA_SAVE_MAX_UNSAVED:
+            self.save_requested.set()
+
+    async def flush_wallet_saves(self):
+        """
+            Saves the wallet once for all the changes made since the last
+            save
+        """
+        async with self.save_lock:
+            if not self.unsaved_changes:
+                return
+            unsaved_changes = self.unsaved_changes
+            self.unsaved_changes = 0
+            saved = False
+            try:
+                res = await self.save_wallet()
+                saved = res.status_code < 400
+            finally:
+                # Also runs when the save is cancelled
+                if not saved:
+                    self.unsaved_changes += unsaved_changes
+
+    async def save_wallet_forever(self):
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self.save_requested.wait(), settings.BAZA_SAVE_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self.save_requested.clear()
+            try:
+                await self.flush_wallet_saves()
+            except httpx.HTTPError as e:
+                logger.warning(f"Saving baza wallet failed: {e!r}")
+
+    async def refresh_wallet(self):
+        await self.get_api_response(
             'PUT', '/reset', data={'scanHeight': 1100000})
 
-    def wallet_is_ready(self):
-        res = self.get_wallet_status()
-        if res.status_code == 200:
-            res_data = res.json()
-            if res_data['networkBlockCount'] == res_data['walletBlockCount']:
+    async def wallet_is_ready(self):
+        status = await self.get_status()
+        if status:
+            if status['networkBlockCount'] == status['walletBlockCount']:
                 return True
         return False
 
-    def get_new_address(self) -> Optional[str]:
-        if self.wallet_is_open and self.wallet_is_ready():
-            res = self.get_api_response('POST', '/addresses/create')
-            self.save_wallet()
+    async def get_new_address(self) -> Optional[str]:
+        if self.wallet_is_open and await self.wallet_is_ready():
+            res = await self.get_api_response('POST', '/addresses/create')
             if res.status_code == 201:
+                self.mark_wallet_unsaved()
                 return res.json()['address']
 
-    def validate_address(self, address: str) -> bool:
-        if self.wallet_is_open and self.wallet_is_ready():
-            res = self.get_api_response(
+    async def validate_address(self, address: str) -> bool:
+        if self.wallet_is_open and await self.wallet_is_ready():
+            res = await self.get_api_response(
                 'POST', '/addresses/validate', data={'address': address})
             if res.status_code == 200:
                 return True
         return False
 
-    def list_transactions(self, address: str) -> Optional[List]:
-        if self.wallet_is_open and self.wallet_is_ready():
-            # NOTE: We need to cache this value, for MVP it is good, we need to
-            # make better solution later
-            res = self.get_wallet_status()
-            if res.status_code == 200:
-                block_count = res.json()['walletBlockCount']
-            res = self.get_api_response(
-                'GET', f'/transactions/address/{address}/{block_count-500}'
-            )
+    async def get_block_count(self) -> Optional[int]:
+        if self.wallet_is_open:
+            status = await self.get_status()
+            if status:
+                return status['walletBlockCount']
+
+    async def list_transactions(
+            self, start_height: int, end_height: int) -> Optional[List]:
+        if self.wallet_is_open and await self.wallet_is_ready():
+            res = await self.get_api_response(
+                'GET', f'/transactions/{start_height}/{end_height}')
             if res.status_code == 200:
-                return res.json()
+                return res.json()['transactions']
 
-    def send_to_address(self, address: str, amount: int) -> Optional[Dict]:
-        if self.wallet_is_open and self.wallet_is_ready():
-            res = self.get_api_response(
+    async def send_to_address(
+            self, address: str, amount: int) -> Optional[Dict]:
+        if self.wallet_is_open and await self.wallet_is_ready():
+            res = await self.get_api_response(
                 'POST', '/transactions/send/basic',
                 data={'destination': address, 'amount': amount})
             if res.status_code == 201:
                 return res.json()
 
-    def get_transaction_by_id(self, txid: str) -> Optional[Dict]:
-        if self.wallet_is_open and self.wallet_is_ready():
-            res = self.get_api_response(
+    async def get_transaction_by_id(self, txid: str) -> Optional[Dict]:
+        if self.wallet_is_open and await self.wallet_is_ready():
+            res = await self.get_api_response(
                 'GET', f'/transactions/hash/{txid}')
             if res.status_code == 200:
                 return res.json()
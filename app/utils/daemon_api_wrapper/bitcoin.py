@@ -2,10 +2,10 @@ import json
 from decimal import Decimal
 from typing import List, Optional, Dict
 
-import requests
-from requests.auth import HTTPBasicAuth
+import httpx
 
 from app.core.config import settings
+from app.utils.daemon_api_wrapper.http_client import create_http_client
 
 # TODO: Check whether result sent for error case too
 
@@ -14,51 +14,64 @@ class BitcoinAPIWrapper(object):
     def __init__(
             self, daemon_host_url: str, username: str, password: str) -> None:
         self.daemon_host_url: str = daemon_host_url
-        self.auth: HTTPBasicAuth = HTTPBasicAuth(username, password)
+        self.client: httpx.AsyncClient = create_http_client(
+            auth=httpx.BasicAuth(username, password))
         self.wallet_is_loaded = False
 
-    def call_rpc_api(
+    async def close(self):
+        await self.client.aclose()
+
+    async def call_rpc_api(
             self, method_name: str, params: List = []) -> Dict:
         data = json.dumps({
             "jsonrpc": "1.0", "id": 1,
             "method": method_name, "params": params
         })
-        res = requests.post(self.daemon_host_url, data, auth=self.auth)
+        res = await self.client.post(self.daemon_host_url, content=data)
         if res.status_code == 200:
             return {"success": True, "data": res.json()}
         return {"success": False, "data": res.content}
 
-    def check_wallet_loaded(self):
-        res = self.call_rpc_api('getbalance')
+    async def check_wallet_loaded(self):
+        res = await self.call_rpc_api('getbalance')
         if res['success']:
             self.wallet_is_loaded = True
 
-    def load_wallet(self):
-        res = self.call_rpc_api('loadwallet', [settings.BITCOIN_WALLET_NAME])
+    async def load_wallet(self):
+        res = await self.call_rpc_api(
+            'loadwallet', [settings.BITCOIN_WALLET_NAME])
         if res['success']:
             self.wallet_is_loaded = True
 
-    def unload_wallet(self):
-        res = self.call_rpc_api('unloadwallet', [settings.BITCOIN_WALLET_NAME])
+    async def unload_wallet(self):
+        res = await self.call_rpc_api(
+            'unloadwallet', [settings.BITCOIN_WALLET_NAME])
         if res['success']:
             self.wallet_is_loaded = False
 
-    def get_balance(self) -> Optional[float]:
+    async def get_balance(self) -> Optional[float]:
         if self.wallet_is_loaded:
-            res = self.call_rpc_api('getbalance')
+            res = await self.call_rpc_api('getbalance')
             if res['success']:
                 return res['data']['result']
 
-    def get_new_address(self) -> Optional[str]:
+    async def get_new_address(self) -> Optional[str]:
         if self.wallet_is_loaded:
-            res = self.call_rpc_api('getnewaddress')
+            res = await self.call_rpc_api('getnewaddress')
             if res['success']:
                 return res['data']['result']
 
-    def list_transactions(self, address: str) -> Optional[List]:
+    async def import_watch_only_address(self, address: str) -> bool:
+        if self.wallet_is_loaded:
+            res = await self.call_rpc_api(
+                'importaddress', [address, '', False])
+            return res['success']
+        return False
+
+    async def list_transactions(self, address: str) -> Optional[List]:
         if self.wallet_is_loaded:
             # TODO: Change confirmation to 6 once test done
-            res = self.call_rpc_api(
+            res = await self.call_rpc_api(
                 'listreceivedbyaddress',
                 [
                     settings.BITCOIN_MIN_CONFIRMATION_NEEDED, False, False,
@@ -68,21 +81,31 @@ class BitcoinAPIWrapper(object):
             if res['success']:
                 return res['data']['result']
 
-    def validate_address(self, address: str) -> bool:
+    async def list_since_block(self, block_hash: str = '') -> Optional[Dict]:
+        if self.wallet_is_loaded:
+            res = await self.call_rpc_api(
+                'listsinceblock',
+                [block_hash, settings.BITCOIN_MIN_CONFIRMATION_NEEDED, True]
+            )
+            if res['success']:
+                return res['data']['result']
+
+    async def validate_address(self, address: str) -> bool:
         if self.wallet_is_loaded:
-            res = self.call_rpc_api('validateaddress', [address])
+            res = await self.call_rpc_api('validateaddress', [address])
             if res['success']:
                 return res['data']['result']['isvalid']
 
-    def send_to_address(self, address: str, amount: Decimal) -> Optional[str]:
+    async def send_to_address(
+            self, address: str, amount: Decimal) -> Optional[str]:
         if self.wallet_is_loaded:
-            res = self.call_rpc_api(
+            res = await self.call_rpc_api(
                 'sendtoaddress', [address, float(amount), '', '', True])
             if res['success']:
                 return res['data']['result']
 
-    def get_transaction_by_id(self, txid: str) -> Optional[Dict]:
+    async def get_transaction_by_id(self, txid: str) -> Optional[Dict]:
         if self.wallet_is_loaded:
-            res = self.call_rpc_api('gettransaction', [txid])
+            res = await self.call_rpc_api('gettransaction', [txid])
             if res['success']:
                 return res['data']['result']
@@ -0,0 +1,30 @@
+from typing import Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+
+
+def create_http_client(
+        auth: Optional[httpx.Auth] = None,
+        headers: Optional[Dict] = None,
+        timeout: Optional[float] = None) -> httpx.AsyncClient:
+    """
+        Every api wrapper gets its own client so that a slow daemon only
+        exhausts its own connection pool, connections are kept alive
+        between calls
+    """
+    return httpx.AsyncClient(
+        auth=auth,
+        headers=headers,
+        timeout=httpx.Timeout(
+            timeout or settings.DAEMON_RPC_TIMEOUT,
+            connect=settings.DAEMON_RPC_CONNECT_TIMEOUT
+        ),
+        limits=httpx.Limits(
+            max_connections=settings.DAEMON_RPC_MAX_CONNECTIONS,
+            max_keepalive_connections=settings
+            .DAEMON_RPC_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.DAEMON_RPC_KEEPALIVE_EXPIRY
+        )
+    )
@@ -1,11 +1,12 @@
+import itertools
 import json
 from decimal import Decimal
 from typing import List, Optional, Dict
 
-import requests
-from requests.auth import HTTPDigestAuth
+import httpx
 
 from app.core.config import settings
+from app.utils.daemon_api_wrapper.http_client import create_http_client
 
 PICONERO = Decimal('0.000000000001')
 
@@ -22,27 +23,33 @@ class MoneroAPIWrapper(object):
     def __init__(
             self, daemon_host_url: str, username: str, password: str) -> None:
         self.daemon_host_url: str = daemon_host_url
-        self.auth: HTTPDigestAuth = HTTPDigestAuth(username, password)
+        self.client: httpx.AsyncClient = create_http_client(
+            auth=httpx.DigestAuth(username, password))
         self.wallet_is_loaded = False
+        self.payment_account_indices = itertools.cycle(
+            settings.MONERO_PAYMENT_ACCOUNT_INDICES)
 
-    def call_rpc_api(
+    async def close(self):
+        await self.client.aclose()
+
+    async def call_rpc_api(
             self, method_name: str, params: Dict = {}) -> Dict:
         data = json.dumps({
             "jsonrpc": "2.0", "id": 1,
             "method": method_name, "params": params
         })
-        res = requests.post(self.daemon_host_url, data, auth=self.auth)
+        res = await self.client.post(self.daemon_host_url, content=data)
         if res.status_code == 200:
             return {"success": True, "data": res.json()}
         return {"success": False, "data": res.content}
 
-    def check_wallet_loaded(self):
-        res = self.call_rpc_api('get_balance', {'account_index': 0})
+    async def check_wallet_loaded(self):
+        res = await self.call_rpc_api('get_balance', {'account_index': 0})
         if res['success']:
             self.wallet_is_loaded = True
 
-    def load_wallet(self):
-        res = self.call_rpc_api(
+    async def load_wallet(self):
+        res = await self.call_rpc_api(
             'open_wallet',
             {
                 "filename": settings.MONERO_WALLET_NAME,
@@ -52,50 +59,77 @@ class MoneroAPIWrapper(object):
         if res['success']:
             self.wallet_is_loaded = True
 
-    def unload_wallet(self):
-        res = self.call_rpc_api('close_wallet')
+    async def unload_wallet(self):
+        res = await self.call_rpc_api('close_wallet')
         if res['success']:
             self.wallet_is_loaded = False
 
-    def get_balance(self, account_index: int = 0) -> Optional[Decimal]:
+    async def get_balance(self, account_index: int = 0) -> Optional[Decimal]:
         if self.wallet_is_loaded:
-            res = self.call_rpc_api(
+            res = await self.call_rpc_api(
                 'get_balance', {'account_index': account_index})
             if res['success'] and res['data'].get('result'):
                 return from_atomic(res['data']['result']['balance'])
 
-    def get_new_address(self) -> Optional[Dict]:
+    async def get_new_address(self) -> Optional[Dict]:
         if self.wallet_is_loaded:
-            res = self.call_rpc_api('create_account')
-            if res['success']:
-                return res['data']['result']
+            account_index = next(self.payment_account_indices)
+            res = await self.call_rpc_api(
+                'create_address', {'account_index': account_index})
+            if res['success'] and res['data'].get('result'):
+                return {
+                    **res['data']['result'],
+                    'account_index': account_index
+                }
 
-    def list_transactions(
+    async def get_height(self) -> Optional[int]:
+        if self.wallet_is_loaded:
+            res = await self.call_rpc_api('get_height')
+            if res['success'] and res['data'].get('result'):
+                return res['data']['result']['height']
+
+    async def list_transactions(
             self, account_index: int = 0) -> Optional[List]:
         if self.wallet_is_loaded:
-            res = self.call_rpc_api(
+            res = await self.call_rpc_api(
                 'get_transfers', {'in': True, 'account_index': account_index})
             if res['success'] and res['data'].get('result'):
                 return res['data']['result']['in']
 
-    def validate_address(self, address: str) -> bool:
+    async def list_subaddress_transactions(
+            self, account_index: int, address_indices: List[int],
+            min_height: Optional[int] = None) -> Optional[List]:
+        if self.wallet_is_loaded:
+            res = await self.call_rpc_api('get_transfers', {
+                'in': True,
+                'account_index': account_index,
+                'subaddr_indices': address_indices,
+                'filter_by_height': min_height is not None,
+                'min_height': min_height or 0
+            })
+            if res['success'] and 'result' in res['data']:
+                return res['data']['result'].get('in', [])
+
+    async def validate_address(self, address: str) -> bool:
         if self.wallet_is_loaded:
-            res = self.call_rpc_api(
+            res = await self.call_rpc_api(
                 'validate_address', {'address': address})
             if res['success'] and res['data'].get('result'):
                 return res['data']['result']['valid']
 
-    def send_to_address(self, address: str, amount: int) -> Optional[Dict]:
+    async def send_to_address(
+            self, address: str, amount: int) -> Optional[Dict]:
         if self.wallet_is_loaded:
-            res = self.call_rpc_api('transfer', {
+            res = await self.call_rpc_api('transfer', {
                 'destinations': [
                     {'amount': amount, 'address': address}
                 ]})
             if res['success'] and res['data'].get('result'):
                 return res['data']['result']
 
-    def get_transaction_by_id(self, txid: str) -> Optional[Dict]:
+    async def get_transaction_by_id(self, txid: str) -> Optional[Dict]:
         if self.wallet_is_loaded:
-            res = self.call_rpc_api('get_transfer_by_txid', {'txid': txid})
+            res = await self.call_rpc_api(
+                'get_transfer_by_txid', {'txid': txid})
             if res['success'] and res['data'].get('result'):
                 return res['data']['result']
@@ -0,0 +1,103 @@
+import csv
+import io
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import DESCENDING
+
+from app.constants.export import ExportFormat
+from app.core.config import settings
+
+
+def get_export_fields(
+        fields: Optional[str], allowed_fields: Tuple[str, ...]) -> List[str]:
+    """
+        Parses a comma separated field selection, raises ValueError naming
+        the first field that can not be exported
+    """
+    if not fields:
+        return list(allowed_fields)
+    export_fields = [field.strip() for field in fields.split(',')]
+    for field in export_fields:
+        if field not in allowed_fields:
+            raise ValueError(f'Field {field} can not be exported')
+    return export_fields
+
+
+def get_created_on_query(
+        created_after: Optional[datetime],
+        created_before: Optional[datetime]) -> Dict:
+    """
+        created_on is the generation time of _id, so the range is applied
+        to _id and served by the same indexes as the listings
+    """
+    id_range = {}
+    if created_after:
+        id_range['$gte'] = ObjectId.from_datetime(created_after)
+    if created_before:
+        id_range['$lt'] = ObjectId.from_datetime(created_before)
+    if id_range:
+        return {'_id': id_range}
+    return {}
+
+
+def get_export_value(document: Dict, field: str) -> Any:
+    if field == 'id':
+        return str(document['_id'])
+    if field == 'created_on':
+        return document['_id'].generation_time.isoformat()
+    value = document.get(field)
+    if isinstance(value, (Decimal, ObjectId)):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def format_ndjson_row(values: Dict) -> str:
+    return json.dumps(values, default=str) + '\n'
+
+
+def format_csv_row(values: Iterable) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow([
+        ';'.join(value) if isinstance(value, list)
+        else '' if value is None else value
+        for value in values
+    ])
+    return buffer.getvalue()
+
+
+async def stream_export(
+        collection: AsyncIOMotorCollection, query: Dict,
+        fields: List[str], export_format: ExportFormat) -> AsyncIterator[str]:
+    """
+        Reads the matching documents straight from the cursor and yields
+        them in chunks of EXPORT_BATCH_SIZE rows, so memory use does not
+        grow with the export
+    """
+    projection = {
+        field: True for field in fields if field not in ('id', 'created_on')
+    }
+    cursor = collection.find(
+        query, projection,
+        batch_size=settings.EXPORT_BATCH_SIZE
+    ).sort('_id', DESCENDING)
+    rows = []
+    if export_format == ExportFormat.CSV:
+        rows.append(format_csv_row(fields))
+    async for document in cursor:
+        values = [get_export_value(document, field) for field in fields]
+        if export_format == ExportFormat.CSV:
+            rows.append(format_csv_row(values))
+        else:
+            rows.append(format_ndjson_row(dict(zip(fields, values))))
+        if len(rows) >= settings.EXPORT_BATCH_SIZE:
+            yield ''.join(rows)
+            rows = []
+    if rows:
+        yield ''.join(rows)
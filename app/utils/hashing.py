@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(settings.LOGGER_NAME)
+
+
+class HashingExecutor(object):
+    """
+        Runs bcrypt hashing and verification in a bounded thread pool, the
+        bcrypt backend releases the GIL so the event loop keeps serving
+        other requests while hashes are computed. Jobs wait for a free
+        worker on the event loop, where their queue time is measured, and
+        the metrics are logged every HASHING_METRICS_LOG_INTERVAL seconds
+    """
+    executor: Optional[ThreadPoolExecutor] = None
+    semaphore: Optional[asyncio.Semaphore] = None
+    waiting: int = 0
+    # Only updated on the event loop thread
+    metrics: Dict[str, float] = {}
+    metrics_since: float = 0
+
+    def get_executor(self) -> ThreadPoolExecutor:
+        if not self.executor:
+            self.executor = ThreadPoolExecutor(
+                max_workers=settings.HASHING_MAX_WORKERS,
+                thread_name_prefix='hashing')
+            self.reset_metrics()
+        return self.executor
+
+    def get_semaphore(self) -> asyncio.Semaphore:
+        if not self.semaphore:
+            self.semaphore = asyncio.Semaphore(settings.HASHING_MAX_WORKERS)
+        return self.semaphore
+
+    def reset_metrics(self):
+        self.metrics = {
+            'completed': 0,
+            'failed': 0,
+            'cancelled': 0,
+            'queue_time_total': 0,
+            'queue_time_max': 0
+        }
+        self.metrics_since = time.monotonic()
+
+    def log_metrics(self):
+        jobs = self.metrics['completed'] + self.metrics['failed'] \
+            + self.metrics['cancelled']
+        queue_time_average = \
+            self.metrics['queue_time_total'] / jobs if jobs else 0
+        logger.info(
+            f"Hashing in the last "
+            f"{time.monotonic() - self.metrics_since:.0f}s: "
+            f"{self.metrics['completed']} completed, "
+            f"{self.metrics['failed']} failed, "
+            f"{self.metrics['cancelled']} cancelled, "
+            f"{self.waiting} waiting, queue time "
+            f"{queue_time_average:.3f}s average, "
+            f"{self.metrics['queue_time_max']:.3f}s max")
+
+    def record_job(self, outcome: str, queue_time: float):
+        self.metrics[outcome] += 1
+        self.metrics['queue_time_total'] += queue_time
+        self.metrics['queue_time_max'] = max(
+            self.metrics['queue_time_max'], queue_time)
+        if time.monotonic() - self.metrics_since \
+                >= settings.HASHING_METRICS_LOG_INTERVAL:
+            self.log_metrics()
+            self.reset_metrics()
+
+    async def run(self, func: Callable, *args) -> Any:
+        executor = self.get_executor()
+        semaphore = self.get_semaphore()
+        queued_on = time.monotonic()
+        self.waiting += 1
+        try:
+            await semaphore.acquire()
+        except asyncio.CancelledError:
+            self.record_job('cancelled', time.monotonic() - queued_on)
+            raise
+        finally:
+            self.waiting -= 1
+        queue_time = time.monotonic() - queued_on
+        if queue_time > settings.HASHING_QUEUE_TIME_WARNING:
+            logger.warning(f"Hashing job waited {queue_time:.3f}s to run")
+        try:
+            result = await asyncio.get_event_loop().run_in_executor(
+                executor, partial(func, *args))
+        except asyncio.CancelledError:
+            self.record_job('cancelled', queue_time)
+            raise
+        except Exception:
+            self.record_job('failed', queue_time)
+            raise
+        finally:
+            semaphore.release()
+        self.record_job('completed', queue_time)
+        return result
+
+    def shutdown(self):
+        if self.executor:
+            self.log_metrics()
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+
+hashing_executor = HashingExecutor()
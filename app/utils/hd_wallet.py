@@ -0,0 +1,196 @@
+import hashlib
+import hmac
+from functools import lru_cache
+from typing import NamedTuple, Optional, Tuple
+
+from app.constants.address import EXTENDED_PUBLIC_KEY_ADDRESS_TYPES
+from app.utils.address_encoding import (
+    base58check_decode, base58check_encode, encode_segwit_address, hash160)
+
+# secp256k1 field prime, group order and generator point
+SECP256K1_P = 2 ** 256 - 2 ** 32 - 977
+SECP256K1_N = \
+    0xfffffffffffffffffffffffffffffffebaaedce6af48a03bbfd25e8cd0364141
+SECP256K1_G = (
+    0x79be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798,
+    0x483ada7726a3c4655da4fbfc0e1108a8fd17b448a68554199c47d08ffb10d4b8
+)
+HARDENED_INDEX = 2 ** 31
+
+Point = Optional[Tuple[int, int]]
+
+
+class ExtendedPublicKey(NamedTuple):
+    version: bytes
+    depth: int
+    parent_fingerprint: bytes
+    child_number: int
+    chain_code: bytes
+    public_key: bytes
+
+
+def point_add(p1: Point, p2: Point) -> Point:
+    if p1 is None:
+        return p2
+    if p2 is None:
+        return p1
+    if p1[0] == p2[0] and (p1[1] + p2[1]) % SECP256K1_P == 0:
+        return None
+    if p1 == p2:
+        slope = 3 * p1[0] * p1[0] * pow(2 * p1[1], -1, SECP256K1_P)
+    else:
+        slope = (p2[1] - p1[1]) * pow(p2[0] - p1[0], -1, SECP256K1_P)
+    slope %= SECP256K1_P
+    x = (slope * slope - p1[0] - p2[0]) % SECP256K1_P
+    return (x, (slope * (p1[0] - x) - p1[1]) % SECP256K1_P)
+
+
+def _jacobian_double(point: Tuple[int, int, int]) -> Tuple[int, int, int]:
+    x, y, z = point
+    if not y:
+        return (0, 0, 0)
+    y_squared = y * y % SECP256K1_P
+    s = 4 * x * y_squared % SECP256K1_P
+    m = 3 * x * x % SECP256K1_P
+    nx = (m * m - 2 * s) % SECP256K1_P
+    ny = (m * (s - nx) - 8 * y_squared * y_squared) % SECP256K1_P
+    return (nx, ny, 2 * y * z % SECP256K1_P)
+
+
+def _jacobian_add_affine(
+        point: Tuple[int, int, int],
+        affine: Tuple[int, int]) -> Tuple[int, int, int]:
+    x1, y1, z1 = point
+    if not z1:
+        return (affine[0], affine[1], 1)
+    z1_squared = z1 * z1 % SECP256K1_P
+    u2 = affine[0] * z1_squared % SECP256K1_P
+    s2 = affine[1] * z1_squared * z1 % SECP256K1_P
+    h = (u2 - x1) % SECP256K1_P
+    r = (s2 - y1) % SECP256K1_P
+    if not h:
+        if not r:
+            return _jacobian_double(point)
+        return (0, 0, 0)
+    h_squared = h * h % SECP256K1_P
+    h_cubed = h * h_squared % SECP256K1_P
+    v = x1 * h_squared % SECP256K1_P
+    nx = (r * r - h_cubed - 2 * v) % SECP256K1_P
+    ny = (r * (v - nx) - y1 * h_cubed) % SECP256K1_P
+    return (nx, ny, h * z1 % SECP256K1_P)
+
+
+def point_multiply(k: int, point: Point) -> Point:
+    """
+        Double and add in jacobian coordinates so that only the final
+        conversion back to affine needs a modular inverse
+    """
+    result = (0, 0, 0)
+    for bit in bin(k)[2:]:
+        result = _jacobian_double(result)
+        if bit == '1':
+            result = _jacobian_add_affine(result, point)
+    x, y, z = result
+    if not z:
+        return None
+    z_inverse = pow(z, -1, SECP256K1_P)
+    z_inverse_squared = z_inverse * z_inverse % SECP256K1_P
+    return (
+        x * z_inverse_squared % SECP256K1_P,
+        y * z_inverse_squared * z_inverse % SECP256K1_P
+    )
+
+
+def decompress_public_key(public_key: bytes) -> Point:
+    if len(public_key) != 33 or public_key[0] not in (2, 3):
+        raise ValueError('Invalid compressed public key')
+    x = int.from_bytes(public_key[1:], 'big')
+    y = pow(
+        (pow(x, 3, SECP256K1_P) + 7) % SECP256K1_P,
+        (SECP256K1_P + 1) // 4, SECP256K1_P)
+    if (y * y - x ** 3 - 7) % SECP256K1_P:
+        raise ValueError('Public key is not on the curve')
+    if y & 1 != public_key[0] & 1:
+        y = SECP256K1_P - y
+    return (x, y)
+
+
+def compress_public_key(point: Point) -> bytes:
+    return bytes([2 + (point[1] & 1)]) + point[0].to_bytes(32, 'big')
+
+
+def parse_extended_public_key(extended_key: str) -> ExtendedPublicKey:
+    data = base58check_decode(extended_key)
+    if len(data) != 78:
+        raise ValueError('Invalid extended public key length')
+    extended_public_key = ExtendedPublicKey(
+        version=data[0:4],
+        depth=data[4],
+        parent_fingerprint=data[5:9],
+        child_number=int.from_bytes(data[9:13], 'big'),
+        chain_code=data[13:45],
+        public_key=data[45:78]
+    )
+    decompress_public_key(extended_public_key.public_key)
+    return extended_public_key
+
+
+def derive_child_public_key(
+        parent: ExtendedPublicKey, index: int) -> ExtendedPublicKey:
+    """
+        BIP32 public parent key to public child key derivation, only non
+        hardened children can be derived from a public key
+    """
+    if not 0 <= index < HARDENED_INDEX:
+        raise ValueError('Hardened child can not be derived from xpub')
+    digest = hmac.new(
+        parent.chain_code,
+        parent.public_key + index.to_bytes(4, 'big'),
+        hashlib.sha512
+    ).digest()
+    tweak = int.from_bytes(digest[:32], 'big')
+    if tweak >= SECP256K1_N:
+        raise ValueError(f'Child key {index} is invalid')
+    point = point_add(
+        point_multiply(tweak, SECP256K1_G),
+        decompress_public_key(parent.public_key))
+    if point is None:
+        raise ValueError(f'Child key {index} is invalid')
+    return ExtendedPublicKey(
+        version=parent.version,
+        depth=parent.depth + 1,
+        parent_fingerprint=hash160(parent.public_key)[:4],
+        child_number=index,
+        chain_code=digest[32:],
+        public_key=compress_public_key(point)
+    )
+
+
+@lru_cache(maxsize=8)
+def get_receive_chain_key(extended_key: str) -> ExtendedPublicKey:
+    return derive_child_public_key(
+        parse_extended_public_key(extended_key), 0)
+
+
+def get_address_type(
+        currency_name: str, version: bytes) -> Tuple[str, object]:
+    try:
+        return EXTENDED_PUBLIC_KEY_ADDRESS_TYPES[currency_name][version]
+    except KeyError:
+        raise ValueError(
+            f'Unsupported extended public key version for {currency_name}')
+
+
+def derive_address(currency_name: str, extended_key: str, index: int) -> str:
+    """
+        Derives the receive address at extended_key/0/index, the address
+        type follows the version of the extended key
+    """
+    receive_chain_key = get_receive_chain_key(extended_key)
+    address_type, network = get_address_type(
+        currency_name, receive_chain_key.version)
+    public_key_hash = hash160(
+        derive_child_public_key(receive_chain_key, index).public_key)
+    if address_type == 'p2wpkh':
+        return encode_segwit_address(network, 0, public_key_hash)
+    return base58check_encode(bytes([network]) + public_key_hash)
@@ -0,0 +1,73 @@
+from typing import List
+
+KECCAK_256_RATE = 136
+KECCAK_LANE_MASK = 2 ** 64 - 1
+# Rotation offsets of lane (x, y) as KECCAK_ROTATIONS[x][y]
+KECCAK_ROTATIONS = [
+    [0, 36, 3, 41, 18],
+    [1, 44, 10, 45, 2],
+    [62, 6, 43, 15, 61],
+    [28, 55, 25, 21, 56],
+    [27, 20, 39, 8, 14]
+]
+
+
+def _get_round_constants() -> List[int]:
+    round_constants = []
+    lfsr = 1
+    for _ in range(24):
+        round_constant = 0
+        for j in range(7):
+            lfsr = ((lfsr << 1) ^ ((lfsr >> 7) * 0x71)) % 256
+            if lfsr & 2:
+                round_constant ^= 1 << ((1 << j) - 1)
+        round_constants.append(round_constant)
+    return round_constants
+
+
+KECCAK_ROUND_CONSTANTS = _get_round_constants()
+
+
+def _rotate_left(lane: int, n: int) -> int:
+    return ((lane << n) | (lane >> (64 - n))) & KECCAK_LANE_MASK
+
+
+def keccak_f1600(state: List[int]) -> List[int]:
+    for round_constant in KECCAK_ROUND_CONSTANTS:
+        c = [
+            state[x] ^ state[x + 5] ^ state[x + 10]
+            ^ state[x + 15] ^ state[x + 20]
+            for x in range(5)
+        ]
+        d = [c[(x - 1) % 5] ^ _rotate_left(c[(x + 1) % 5], 1)
+             for x in range(5)]
+        state = [state[i] ^ d[i % 5] for i in range(25)]
+        b = [0] * 25
+        for x in range(5):
+            for y in range(5):
+                b[y + 5 * ((2 * x + 3 * y) % 5)] = _rotate_left(
+                    state[x + 5 * y], KECCAK_ROTATIONS[x][y])
+        state = [
+            b[i] ^ (~b[(i + 1) % 5 + i - i % 5] & b[(i + 2) % 5 + i - i % 5])
+            for i in range(25)
+        ]
+        state[0] ^= round_constant
+    return state
+
+
+def keccak_256(data: bytes) -> bytes:
+    """
+        The original keccak padding used by cryptonote, hashlib's sha3_256
+        pads differently and gives other digests
+    """
+    padded = bytearray(data)
+    padded.append(0x01)
+    padded.extend(b'\x00' * (-len(padded) % KECCAK_256_RATE))
+    padded[-1] |= 0x80
+    state = [0] * 25
+    for offset in range(0, len(padded), KECCAK_256_RATE):
+        block = padded[offset:offset + KECCAK_256_RATE]
+        for i in range(KECCAK_256_RATE // 8):
+            state[i] ^= int.from_bytes(block[8 * i:8 * (i + 1)], 'little')
+        state = keccak_f1600(state)
+    return b''.join(lane.to_bytes(8, 'little') for lane in state[:4])
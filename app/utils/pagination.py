@@ -0,0 +1,42 @@
+import base64
+from typing import Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import DESCENDING
+
+from app.exceptions.pagination import InvalidCursorException
+
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(last_id: ObjectId) -> str:
+    return base64.urlsafe_b64encode(last_id.binary).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> ObjectId:
+    try:
+        return ObjectId(base64.urlsafe_b64decode(cursor + '=' * (
+            -len(cursor) % 4)))
+    except (InvalidId, ValueError, TypeError):
+        raise InvalidCursorException()
+
+
+async def paginate(
+        collection: AsyncIOMotorCollection, query: Dict,
+        limit: int, cursor: Optional[str] = None,
+        projection: Optional[Dict] = None) -> Tuple[List[Dict], Optional[str]]:
+    """
+        Keyset pagination over _id descending, newest first. The returned
+        cursor is None on the last page, otherwise it is passed back to get
+        the next page at the same cost as the first
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if cursor:
+        query = {'$and': [query, {'_id': {'$lt': decode_cursor(cursor)}}]}
+    documents = await collection.find(query, projection).sort(
+        '_id', DESCENDING).limit(limit + 1).to_list(limit + 1)
+    if len(documents) > limit:
+        return documents[:limit], encode_cursor(documents[limit - 1]['_id'])
+    return documents, None
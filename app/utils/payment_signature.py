@@ -0,0 +1,16 @@
+import hmac
+import hashlib
+from typing import Dict
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+
+async def create_payment_signature(
+        db: AsyncIOMotorDatabase, payment: Dict):
+    project = await db.projects.find_one(
+        {'id': payment['related_project_id']})
+    message = f"{payment['payment_id']}" + \
+              f"{payment['wallet_address']}{payment['currency_name']}"
+    return hmac.new(
+        project['payment_signature_secret'].encode(),
+        message.encode(), hashlib.sha256).hexdigest()
@@ -0,0 +1,581 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from arq.connections import ArqRedis
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, ReturnDocument, UpdateOne
+
+from app.core.config import settings
+from app.crud import chain_cursors
+from app.crud.payment_counters import count_payment_transition
+from app.models.payments import PaymentDB, PaymentUpdate
+from app.redis import redis_manager
+from app.utils.daemon_api_wrapper import daemon_api_wrapper_manager
+from app.utils.daemon_api_wrapper.monero import from_atomic
+from app.utils.daemon_api_wrapper.baza import from_atomic as baza_from_atomic
+from app.utils.payment_signature import create_payment_signature
+from app.constants.payment import (
+    TX_FIELDS_TO_CHECK, TX_FIELDS_TO_SAVE, CRYPTO_ATOMIC,
+    PAYMENT_STATUS_CHANNEL_PREFIX)
+from app.constants.payment_status import PaymentStatus
+
+logger = logging.getLogger(settings.LOGGER_NAME)
+
+
+class IncomingTransfer(NamedTuple):
+    txid: str
+    amount: Decimal
+    confirmations: Optional[int]
+    raw_tx_data: Dict
+
+
+def check_payment_valid(payment_results: List, currency_name: str) -> bool:
+    fields = TX_FIELDS_TO_CHECK[currency_name]
+    for payment_result in payment_results:
+        for field in fields:
+            if not payment_result.get(field):
+                return False
+            if currency_name != 'baza':
+                if not payment_result['confirmations'] >= \
+                        settings.dict()[
+                        f'{currency_name.upper()}_MIN_CONFIRMATION_NEEDED']:
+                    return False
+    return True
+
+
+def convert_payment_amount(
+        amount: Union[float, int],
+        currency_name: str) -> Decimal:
+    if currency_name == 'monero':
+        return from_atomic(amount).quantize(CRYPTO_ATOMIC, ROUND_HALF_UP)
+    if currency_name == 'baza':
+        return baza_from_atomic(amount).quantize(CRYPTO_ATOMIC, ROUND_HALF_UP)
+    return Decimal(amount).quantize(CRYPTO_ATOMIC, ROUND_HALF_UP)
+
+
+def compare_payment_address(
+        payment_result: Dict, wallet_address: str, currency_name: str) -> bool:
+    if currency_name == 'baza':
+        for transfer in payment_result['transfers']:
+            if transfer['address'] != wallet_address:
+                return False
+            return True
+    return payment_result['address'] == wallet_address
+
+
+def get_payment_amount_and_txid(
+        payment_results: List,
+        currency_name: str, wallet_address: str) -> Tuple[Decimal, List]:
+    fields = TX_FIELDS_TO_SAVE[currency_name]
+    amount = Decimal('0')
+    txids_list = []
+    for payment_result in payment_results:
+        if compare_payment_address(
+                payment_result, wallet_address, currency_name):
+            if currency_name == 'baza':
+                for transfer in payment_result[fields[0]]:
+                    amount += convert_payment_amount(
+                        transfer['amount'], currency_name)
+            else:
+                amount += convert_payment_amount(
+                    payment_result[fields[0]], currency_name)
+            txids = payment_result.get(fields[1])
+            if isinstance(txids, list):
+                txids_list += txids
+            else:
+                txids_list.append(txids)
+    return (amount, txids_list)
+
+
+def get_payment_status_for_amount(
+        amount: Decimal, amount_requested: Decimal) -> PaymentStatus:
+    if amount > amount_requested:
+        return PaymentStatus.OVERPAID
+    if amount == amount_requested:
+        return PaymentStatus.FULFILLED
+    return PaymentStatus.PENDING
+
+
+async def get_payment_transactions(
+        api_wrapper, payment: PaymentDB) -> Optional[List]:
+    result = await api_wrapper.list_transactions(
+        payment.wallet_address
+        if payment.currency_name != 'monero'
+        else payment.monero_account_index)
+    return result
+
+
+def get_payment_confirmations(
+        payment_results: List,
+        currency_name: str, wallet_address: str) -> Optional[int]:
+    if currency_name == 'baza':
+        return None
+    confirmations = [
+        payment_result.get('confirmations', 0)
+        for payment_result in payment_results
+        if compare_payment_address(
+            payment_result, wallet_address, currency_name)
+    ]
+    if confirmations:
+        return min(confirmations)
+
+
+def get_payment_update(
+        payment: PaymentDB, result: Optional[List]) -> Optional[PaymentUpdate]:
+    if not result:
+        return None
+    confirmations = get_payment_confirmations(
+        result, payment.currency_name, payment.wallet_address)
+    if check_payment_valid(result, payment.currency_name):
+        amount, txids = get_payment_amount_and_txid(
+            result, payment.currency_name, payment.wallet_address)
+        if txids != payment.tx_ids:
+            return PaymentUpdate(
+                amount_received=amount,
+                tx_ids=txids,
+                raw_tx_data=json.dumps(result),
+                status=get_payment_status_for_amount(
+                    amount, payment.amount_requested),
+                confirmations=confirmations
+            )
+    if confirmations != payment.confirmations:
+        return PaymentUpdate(
+            amount_received=payment.amount_received,
+            tx_ids=payment.tx_ids,
+            raw_tx_data=payment.raw_tx_data,
+            status=payment.status,
+            confirmations=confirmations
+        )
+
+
+async def publish_payment_updates(payment_ids: List[str]) -> None:
+    for payment_id in payment_ids:
+        await redis_manager.redis_client.publish(
+            f'{PAYMENT_STATUS_CHANNEL_PREFIX}{payment_id}', payment_id)
+
+
+async def dispatch_payment_jobs(
+        db: AsyncIOMotorDatabase, arq_pool: ArqRedis, payment: Dict) -> None:
+    """
+        The job ids are derived from the payment id so that a payment
+        can never queue its webhook or payout twice. jobs_dispatched is
+        only set after both jobs are queued
+    """
+    payment_signature = await create_payment_signature(db, payment)
+    await arq_pool.enqueue_job(
+        'task_send_payment_data_to_webhook',
+        payment['payment_id'],
+        payment_signature,
+        _job_id=f"task_send_payment_data_to_webhook:{payment['payment_id']}")
+    await arq_pool.enqueue_job(
+        'task_add_payment_to_payout_queue',
+        payment['payment_id'],
+        _job_id=f"task_add_payment_to_payout_queue:{payment['payment_id']}")
+    await db.payments.update_one(
+        {'payment_id': payment['payment_id']},
+        {'$set': {'jobs_dispatched': True}}
+    )
+
+
+async def redispatch_payment_jobs(
+        db: AsyncIOMotorDatabase, arq_pool: ArqRedis) -> int:
+    """
+        Queues the jobs of finished payments whose dispatch failed after
+        their status changed, returns the number of payments dispatched.
+        Payments stored before the flag existed do not have it and are
+        left alone
+    """
+    dispatched = 0
+    async for payment in db.payments.find({
+        'status': {'$ne': PaymentStatus.PENDING},
+        'jobs_dispatched': False
+    }):
+        try:
+            await dispatch_payment_jobs(db, arq_pool, payment)
+        except Exception as e:
+            logger.error(
+                f"Dispatching jobs of payment {payment['payment_id']} "
+                f"failed: {e}")
+            continue
+        dispatched += 1
+    return dispatched
+
+
+async def transition_payment(
+        db: AsyncIOMotorDatabase, arq_pool: ArqRedis,
+        payment_id: str, payment_update: PaymentUpdate) -> bool:
+    """
+        Moves a pending payment to its final status with a compare and set
+        on the status, only the caller that wins dispatches the jobs
+    """
+    payment = await db.payments.find_one_and_update(
+        {'payment_id': payment_id, 'status': PaymentStatus.PENDING},
+        {
+            '$set': {
+                **payment_update.dict(),
+                'status_changed_on': datetime.now(timezone.utc)
+            }
+        },
+        return_document=ReturnDocument.AFTER
+    )
+    if not payment:
+        return False
+    try:
+        await dispatch_payment_jobs(db, arq_pool, payment)
+    finally:
+        # Statistics never hold up the webhook and payout jobs
+        try:
+            await count_payment_transition(db, payment)
+        except Exception as e:
+            logger.error(
+                f"Recording stats of payment {payment_id} failed: {e}")
+    return True
+
+
+async def apply_payment_updates(
+        db: AsyncIOMotorDatabase, arq_pool: ArqRedis,
+        payment_updates: List[Tuple[str, PaymentUpdate]]) -> int:
+    """
+        Writes the updates of still pending payments with a single bulk
+        write, transitions the rest one by one and publishes every payment
+        that changed, returns the number of payments updated
+    """
+    operations = []
+    transitions = []
+    updated_payment_ids = []
+    for payment_id, payment_update in payment_updates:
+        if payment_update.status != PaymentStatus.PENDING:
+            transitions.append((payment_id, payment_update))
+            continue
+        operations.append(
+            UpdateOne(
+                {'payment_id': payment_id, 'status': PaymentStatus.PENDING},
+                {'$set': payment_update.dict()}
+            )
+        )
+        updated_payment_ids.append(payment_id)
+    if operations:
+        await db.payments.bulk_write(operations, ordered=False)
+    for payment_id, payment_update in transitions:
+        if await transition_payment(
+                db, arq_pool, payment_id, payment_update):
+            updated_payment_ids.append(payment_id)
+    await publish_payment_updates(updated_payment_ids)
+    return len(updated_payment_ids)
+
+
+async def check_pending_payments(
+        db: AsyncIOMotorDatabase, arq_pool: ArqRedis,
+        currency_name: str, payments: List[PaymentDB]) -> int:
+    api_wrapper = daemon_api_wrapper_manager.api_wrappers[currency_name]
+    results = await asyncio.gather(
+        *[get_payment_transactions(api_wrapper, payment)
+          for payment in payments],
+        return_exceptions=True
+    )
+    payment_updates = []
+    for payment, result in zip(payments, results):
+        if isinstance(result, Exception):
+            logger.warning(
+                f"Checking payment {payment.payment_id} failed: {result!r}")
+            continue
+        payment_update = get_payment_update(payment, result)
+        if payment_update:
+            payment_updates.append((payment.payment_id, payment_update))
+    return await apply_payment_updates(db, arq_pool, payment_updates)
+
+
+async def watch_pending_payments_individually(
+        db: AsyncIOMotorDatabase, arq_pool: ArqRedis,
+        currency_name: str, payment_filter: Optional[Dict] = None) -> int:
+    """
+        Checks every pending payment of a currency against the daemon in
+        batches of PAYMENT_WATCHER_BATCH_SIZE, returns the number of
+        payments updated
+    """
+    updated = 0
+    payments: List[PaymentDB] = []
+    payments_cur = db.payments.find(
+        {
+            **(payment_filter or {}),
+            'currency_name': currency_name,
+            'status': PaymentStatus.PENDING
+        },
+        batch_size=settings.PAYMENT_WATCHER_BATCH_SIZE)
+    async for payment in payments_cur:
+        payments.append(PaymentDB(**payment))
+        if len(payments) == settings.PAYMENT_WATCHER_BATCH_SIZE:
+            updated += await check_pending_payments(
+                db, arq_pool, currency_name, payments)
+            payments = []
+    if payments:
+        updated += await check_pending_payments(
+            db, arq_pool, currency_name, payments)
+    return updated
+
+
+def get_payment_update_from_transfers(
+        payment: PaymentDB,
+        transfers: List[IncomingTransfer]) -> Optional[PaymentUpdate]:
+    """
+        Adds the transfers not yet counted for the payment to its received
+        amount, transfers short of the needed confirmations are only
+        reported through the payment's confirmations
+    """
+    min_confirmation_needed = getattr(
+        settings, f'{payment.currency_name.upper()}_MIN_CONFIRMATION_NEEDED',
+        0)
+    counted_txids = set(payment.tx_ids or [])
+    tx_ids = list(payment.tx_ids or [])
+    raw_tx_data = json.loads(payment.raw_tx_data or '[]')
+    amount = payment.amount_received
+    pending_confirmations = []
+    for transfer in transfers:
+        if transfer.txid in counted_txids:
+            continue
+        if transfer.confirmations is not None:
+            if transfer.confirmations < 0:
+                continue
+            if transfer.confirmations < min_confirmation_needed:
+                pending_confirmations.append(transfer.confirmations)
+                continue
+        amount += transfer.amount
+        if transfer.txid not in tx_ids:
+            tx_ids.append(transfer.txid)
+        raw_tx_data.append(transfer.raw_tx_data)
+    confirmations = min(pending_confirmations) \
+        if pending_confirmations else None
+    if amount == payment.amount_received \
+            and confirmations == payment.confirmations:
+        return None
+    return PaymentUpdate(
+        amount_received=amount,
+        tx_ids=tx_ids,
+        raw_tx_data=json.dumps(raw_tx_data),
+        status=get_payment_status_for_amount(
+            amount, payment.amount_requested),
+        confirmations=confirmations
+    )
+
+
+async def update_payments_from_transfers(
+        db: AsyncIOMotorDatabase, arq_pool: ArqRedis, currency_name: str,
+        transfers: Dict[str, List[IncomingTransfer]]) -> int:
+    """
+        Maps transfers keyed by wallet address to the pending payments of
+        those addresses
+    """
+    updated = 0
+    wallet_addresses = list(transfers)
+    for i in range(
+            0, len(wallet_addresses), settings.PAYMENT_WATCHER_BATCH_SIZE):
+        payment_updates = []
+        payments_cur = db.payments.find({
+            'currency_name': currency_name,
+            'status': PaymentStatus.PENDING,
+            'wallet_address': {
+                '$in': wallet_addresses[
+                    i:i + settings.PAYMENT_WATCHER_BATCH_SIZE]
+            }
+        })
+        async for payment in payments_cur:
+            payment = PaymentDB(**payment)
+            payment_update = get_payment_update_from_transfers(
+                payment, transfers[payment.wallet_address])
+            if payment_update:
+                payment_updates.append((payment.payment_id, payment_update))
+        updated += await apply_payment_updates(db, arq_pool, payment_updates)
+    return updated
+
+
+def get_since_block_transfers(
+        currency_name: str,
+        transactions: List[Dict]) -> Dict[str, List[IncomingTransfer]]:
+    transfers = defaultdict(list)
+    for transaction in transactions:
+        if transaction.get('category') != 'receive' \
+                or not transaction.get('address'):
+            continue
+        transfers[transaction['address']].append(
+            IncomingTransfer(
+                txid=transaction['txid'],
+                amount=convert_payment_amount(
+                    transaction['amount'], currency_name),
+                confirmations=transaction['confirmations'],
+                raw_tx_data=transaction
+            )
+        )
+    return transfers
+
+
+async def scan_pending_payments_since_block(
+        db: AsyncIOMotorDatabase, arq_pool: ArqRedis,
+        currency_name: str) -> int:
+    """
+        Fetches every wallet transaction since the stored block cursor with
+        one listsinceblock call instead of one call per pending payment,
+        the daemon returns the cursor lagging by the needed confirmations
+        so under confirmed transactions are seen again on the next scan
+    """
+    api_wrapper = daemon_api_wrapper_manager.api_wrappers[currency_name]
+    block_hash = await chain_cursors.get_chain_cursor(db, currency_name)
+    result = await api_wrapper.list_since_block(block_hash or '')
+    if not result:
+        return 0
+    updated = await update_payments_from_transfers(
+        db, arq_pool, currency_name,
+        get_since_block_transfers(currency_name, result['transactions']))
+    await chain_cursors.set_chain_cursor(
+        db, currency_name, result['lastblock'])
+    return updated
+
+
+def get_subaddress_transfers(
+        transactions: List[Dict]) -> Dict[str, List[IncomingTransfer]]:
+    transfers = defaultdict(list)
+    for transaction in transactions:
+        transfers[transaction['address']].append(
+            IncomingTransfer(
+                txid=transaction['txid'],
+                amount=convert_payment_amount(
+                    transaction['amount'], 'monero'),
+                confirmations=transaction.get('confirmations', 0),
+                raw_tx_data=transaction
+            )
+        )
+    return transfers
+
+
+async def get_pending_subaddress_indices(
+        db: AsyncIOMotorDatabase) -> Dict[int, List[int]]:
+    subaddress_indices = defaultdict(list)
+    payments_cur = db.payments.find(
+        {
+            'currency_name': 'monero',
+            'status': PaymentStatus.PENDING,
+            'monero_address_index': {'$ne': None}
+        },
+        {'monero_account_index': 1, 'monero_address_index': 1},
+        batch_size=settings.PAYMENT_WATCHER_BATCH_SIZE)
+    async for payment in payments_cur:
+        subaddress_indices[payment['monero_account_index']].append(
+            payment['monero_address_index'])
+    return subaddress_indices
+
+
+async def scan_pending_monero_payments(
+        db: AsyncIOMotorDatabase, arq_pool: ArqRedis) -> int:
+    """
+        Queries the pending payment subaddresses of each account with
+        batched get_transfers calls filtered from the stored height, the
+        cursor trails the wallet height by the needed confirmations so
+        under confirmed transfers are seen again on the next scan
+    """
+    api_wrapper = daemon_api_wrapper_manager.api_wrappers['monero']
+    height = await api_wrapper.get_height()
+    if height is None:
+        return 0
+    min_height = await chain_cursors.get_chain_cursor(db, 'monero')
+    transfers = defaultdict(list)
+    subaddress_indices = await get_pending_subaddress_indices(db)
+    for account_index, address_indices in subaddress_indices.items():
+        for i in range(
+                0, len(address_indices), settings.PAYMENT_WATCHER_BATCH_SIZE):
+            transactions = await api_wrapper.list_subaddress_transactions(
+                account_index,
+                address_indices[i:i + settings.PAYMENT_WATCHER_BATCH_SIZE],
+                min_height)
+            if transactions is None:
+                return 0
+            for address, address_transfers in get_subaddress_transfers(
+                    transactions).items():
+                transfers[address] += address_transfers
+    updated = await update_payments_from_transfers(
+        db, arq_pool, 'monero', transfers)
+    await chain_cursors.set_chain_cursor(
+        db, 'monero',
+        max(height - settings.MONERO_MIN_CONFIRMATION_NEEDED - 1, 0))
+    return updated
+
+
+def get_baza_transfers(
+        transactions: List[Dict]) -> Dict[str, List[IncomingTransfer]]:
+    transfers = defaultdict(list)
+    for transaction in transactions:
+        amounts = defaultdict(int)
+        for transfer in transaction['transfers']:
+            if transfer.get('address') and transfer['amount'] > 0:
+                amounts[transfer['address']] += transfer['amount']
+        for address, amount in amounts.items():
+            transfers[address].append(
+                IncomingTransfer(
+                    txid=transaction['hash'],
+                    amount=convert_payment_amount(amount, 'baza'),
+                    confirmations=None,
+                    raw_tx_data=transaction
+                )
+            )
+    return transfers
+
+
+async def scan_pending_baza_payments(
+        db: AsyncIOMotorDatabase, arq_pool: ArqRedis) -> int:
+    """
+        Every pending payment keeps the height its address is scanned
+        from, one bulk transactions call covers the blocks from the lowest
+        scan height and the scan heights are moved past them afterwards
+    """
+    api_wrapper = daemon_api_wrapper_manager.api_wrappers['baza']
+    block_count = await api_wrapper.get_block_count()
+    if block_count is None:
+        return 0
+    payment_filter = {'currency_name': 'baza', 'status': PaymentStatus.PENDING}
+    await db.payments.update_many(
+        {**payment_filter, 'scan_height': None},
+        {'$set': {
+            'scan_height': max(
+                block_count - settings.BAZA_SCAN_START_OFFSET, 0)
+        }}
+    )
+    payment = await db.payments.find_one(
+        payment_filter, {'scan_height': 1},
+        sort=[('scan_height', ASCENDING)])
+    if not payment or payment['scan_height'] >= block_count:
+        return 0
+    start_height = payment['scan_height']
+    end_height = min(
+        start_height + settings.BAZA_SCAN_MAX_BLOCKS, block_count)
+    transactions = await api_wrapper.list_transactions(
+        start_height, end_height)
+    if transactions is None:
+        return 0
+    updated = await update_payments_from_transfers(
+        db, arq_pool, 'baza', get_baza_transfers(transactions))
+    await db.payments.update_many(
+        {**payment_filter, 'scan_height': {'$lt': end_height}},
+        {'$set': {'scan_height': end_height}}
+    )
+    return updated
+
+
+async def watch_pending_payments(
+        db: AsyncIOMotorDatabase, arq_pool: ArqRedis,
+        currency_name: str) -> int:
+    if currency_name == 'baza':
+        return await scan_pending_baza_payments(db, arq_pool)
+    if currency_name in ('bitcoin', 'dogecoin'):
+        return await scan_pending_payments_since_block(
+            db, arq_pool, currency_name)
+    if currency_name == 'monero':
+        # Payments created before subaddress allocation own a whole
+        # account and are still checked one by one
+        updated = await watch_pending_payments_individually(
+            db, arq_pool, currency_name, {'monero_address_index': None})
+        return updated + await scan_pending_monero_payments(db, arq_pool)
+    return await watch_pending_payments_individually(
+        db, arq_pool, currency_name)
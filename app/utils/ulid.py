@@ -0,0 +1,18 @@
+import os
+import time
+
+CROCKFORD_BASE32 = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+# Attempts at inserting a document with a fresh id before giving up on
+# duplicate key errors
+MAX_ID_GENERATION_ATTEMPTS = 3
+
+
+def generate_ulid() -> str:
+    """
+        48 bits of millisecond timestamp followed by 80 random bits in
+        crockford base32, ids sort by creation time as plain strings
+    """
+    value = (int(time.time() * 1000) << 80) \
+        | int.from_bytes(os.urandom(10), 'big')
+    return ''.join(
+        CROCKFORD_BASE32[(value >> (5 * i)) & 31] for i in range(25, -1, -1))
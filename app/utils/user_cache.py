@@ -0,0 +1,130 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from pydantic import UUID4
+
+from app.core.config import settings
+from app.models.users import UserDB
+from app.redis import pubsub_manager, redis_manager
+
+USER_CACHE_PREFIX = 'user_cache:'
+USER_CACHE_INVALIDATION_CHANNEL = 'user_cache_invalidation'
+
+
+class UserCache(object):
+    """
+        Users resolved from access tokens, kept in a bounded LRU per node
+        and in redis across nodes. Invalidations are published so every
+        node drops its local copy at once. Invalidations published while
+        the pubsub connection is down are missed, so the local copies are
+        dropped whenever it reconnects. Cached users have no password
+        hash, code that checks the password loads the user itself
+    """
+    users: 'OrderedDict[str, Tuple[float, UserDB]]' = OrderedDict()
+    # Loads in flight per user and the number of invalidations seen while
+    # they ran, a load that overlapped an invalidation must not cache its
+    # now stale user. Both are dropped once the last load finishes
+    loads: Dict[str, int] = {}
+    generations: Dict[str, int] = {}
+    listener_task = None
+
+    def get_local(self, user_id: str) -> Optional[UserDB]:
+        cached = self.users.get(user_id)
+        if not cached:
+            return None
+        expires_on, user = cached
+        if expires_on <= time.monotonic():
+            del self.users[user_id]
+            return None
+        self.users.move_to_end(user_id)
+        return user
+
+    def remember(self, user: UserDB):
+        user_id = str(user.id)
+        self.users[user_id] = (
+            time.monotonic() + settings.USER_CACHE_TTL, user)
+        self.users.move_to_end(user_id)
+        while len(self.users) > settings.USER_CACHE_SIZE:
+            self.users.popitem(last=False)
+
+    def forget_all(self):
+        self.users.clear()
+        for user_id in self.loads:
+            self.generations[user_id] = self.generations.get(user_id, 0) + 1
+
+    def forget(self, user_id: str):
+        self.users.pop(user_id, None)
+        if user_id in self.loads:
+            self.generations[user_id] = self.generations.get(user_id, 0) + 1
+
+    def start_load(self, user_id: str) -> int:
+        self.loads[user_id] = self.loads.get(user_id, 0) + 1
+        return self.generations.get(user_id, 0)
+
+    def finish_load(self, user_id: str):
+        self.loads[user_id] -= 1
+        if not self.loads[user_id]:
+            del self.loads[user_id]
+            self.generations.pop(user_id, None)
+
+    async def get(
+            self, user_id: UUID4,
+            load: Callable[[UUID4], Awaitable[UserDB]]) -> UserDB:
+        """
+            Resolves the user from memory, then redis, then load which
+            raises if the user does not exist
+        """
+        key = str(user_id)
+        user = self.get_local(key)
+        if user:
+            return user
+        generation = self.start_load(key)
+        try:
+            cached_user = await redis_manager.redis_client.get(
+                f'{USER_CACHE_PREFIX}{key}', encoding='utf-8')
+            if cached_user:
+                user = UserDB(
+                    **json.loads(cached_user), hashed_password='')
+            else:
+                user = (await load(user_id)).copy(
+                    update={'hashed_password': ''})
+                if generation == self.generations.get(key, 0):
+                    await redis_manager.redis_client.set(
+                        f'{USER_CACHE_PREFIX}{key}',
+                        user.json(exclude={'hashed_password'}),
+                        expire=settings.USER_CACHE_TTL)
+            if generation == self.generations.get(key, 0):
+                self.remember(user)
+        finally:
+            self.finish_load(key)
+        return user
+
+    async def invalidate(self, user_id: UUID4):
+        key = str(user_id)
+        self.forget(key)
+        await redis_manager.redis_client.delete(f'{USER_CACHE_PREFIX}{key}')
+        await redis_manager.redis_client.publish(
+            USER_CACHE_INVALIDATION_CHANNEL, key)
+
+    async def listen_for_invalidations(self):
+        async with pubsub_manager.subscribe(
+                USER_CACHE_INVALIDATION_CHANNEL) as queue:
+            while True:
+                self.forget(await queue.get())
+
+    def start_listener(self):
+        pubsub_manager.add_connect_callback(self.forget_all)
+        self.listener_task = asyncio.ensure_future(
+            self.listen_for_invalidations())
+
+    def stop_listener(self):
+        pubsub_manager.remove_connect_callback(self.forget_all)
+        if self.listener_task:
+            self.listener_task.cancel()
+            self.listener_task = None
+
+
+user_cache = UserCache()
@@ -1,35 +1,61 @@
+import asyncio
+import hashlib
+import hmac
 import random
 import string
 from typing import Dict, List, Tuple
 
 from passlib.context import CryptContext
+from pydantic import UUID4
+
+from app.core.config import settings
+from app.utils.hashing import hashing_executor
 
 
 two_factor_recovery_code_ctx = CryptContext(
     schemes=['bcrypt'], deprecated='auto')
 
 
-def verify_two_factor_recovery_code(
+async def verify_two_factor_recovery_code(
         plain_two_factor_recovery_code: str,
         hashed_two_factor_recovery_code: str) -> bool:
-    return two_factor_recovery_code_ctx.verify(
+    return await hashing_executor.run(
+        two_factor_recovery_code_ctx.verify,
         plain_two_factor_recovery_code, hashed_two_factor_recovery_code)
 
 
-def hash_two_factor_recovery_code(plain_two_factor_recovery_code: str) -> str:
-    return two_factor_recovery_code_ctx.hash(
-        plain_two_factor_recovery_code)
-
-
-def get_recovery_codes() -> Tuple[List, List[Dict]]:
-    codes = []
-    codes_hashed = []
-    for i in range(6):
-        code = ''.join(random.SystemRandom().choice(string.digits)
-                       for _ in range(6))
-        codes.append(code)
-        codes_hashed.append({
+async def hash_two_factor_recovery_code(
+        plain_two_factor_recovery_code: str) -> str:
+    return await hashing_executor.run(
+        two_factor_recovery_code_ctx.hash, plain_two_factor_recovery_code)
+
+
+def get_recovery_code_lookup_tag(
+        user_id: UUID4, plain_two_factor_recovery_code: str) -> str:
+    """
+        Keyed so that the tag alone can not be brute forced over the small
+        code space, the bcrypt hash stays the actual check
+    """
+    return hmac.new(
+        settings.SECRET_KEY.encode(),
+        f'{user_id}:{plain_two_factor_recovery_code}'.encode(),
+        hashlib.sha256
+    ).hexdigest()
+
+
+async def get_recovery_codes(user_id: UUID4) -> Tuple[List, List[Dict]]:
+    codes = [
+        ''.join(random.SystemRandom().choice(string.digits)
+                for _ in range(6))
+        for _ in range(6)
+    ]
+    codes_hashed = [
+        {
             'used': False,
-            'code': hash_two_factor_recovery_code(code)
-        })
+            'code': code_hashed,
+            'lookup_tag': get_recovery_code_lookup_tag(user_id, code)
+        }
+        for code, code_hashed in zip(codes, await asyncio.gather(
+            *[hash_two_factor_recovery_code(code) for code in codes]))
+    ]
     return (codes, codes_hashed)
@@ -0,0 +1,96 @@
+import logging
+from typing import List
+
+from aioredis import Redis
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.crud import wallet_address_pool
+from app.models.wallet_address_pool import WalletAddressPoolDB
+from app.redis.lock import redis_lock
+from app.utils.daemon_api_wrapper import daemon_api_wrapper_manager
+from app.utils.watch_only_address import (
+    create_watch_only_address, get_extended_public_key)
+
+logger = logging.getLogger(settings.LOGGER_NAME)
+
+
+async def get_watch_only_wallet_addresses(
+        db: AsyncIOMotorDatabase,
+        currency_name: str, count: int) -> List[WalletAddressPoolDB]:
+    wallet_addresses = []
+    for _ in range(count):
+        wallet_address = await create_watch_only_address(db, currency_name)
+        if not wallet_address:
+            break
+        wallet_addresses.append(
+            WalletAddressPoolDB(
+                currency_name=currency_name,
+                wallet_address=wallet_address
+            )
+        )
+    return wallet_addresses
+
+
+async def refill_wallet_address_pool(
+        db: AsyncIOMotorDatabase, redis_client: Redis,
+        currency_name: str) -> int:
+    """
+        Tops up the currency's address pool to WALLET_ADDRESS_POOL_SIZE
+        once it drops below WALLET_ADDRESS_POOL_LOW_WATER_MARK, returns the
+        number of addresses added. Refills of a currency are serialized so
+        that concurrent runs do not both count the same shortfall
+    """
+    async with redis_lock(
+            redis_client,
+            f'wallet_address_pool_lock:{currency_name}',
+            settings.WALLET_ADDRESS_POOL_LOCK_TIMEOUT) as lock_acquired:
+        if not lock_acquired:
+            return 0
+        return await add_wallet_addresses_to_pool(db, currency_name)
+
+
+async def add_wallet_addresses_to_pool(
+        db: AsyncIOMotorDatabase, currency_name: str) -> int:
+    available = await wallet_address_pool.count_wallet_addresses(
+        db, currency_name)
+    if available >= settings.WALLET_ADDRESS_POOL_LOW_WATER_MARK:
+        return 0
+    if get_extended_public_key(currency_name):
+        # Pooled addresses are unused until handed out, a pool that runs
+        # ahead by more than the gap limit could hide later payments from
+        # xpub recovery
+        wallet_addresses = await get_watch_only_wallet_addresses(
+            db, currency_name,
+            min(
+                settings.WALLET_ADDRESS_POOL_SIZE,
+                settings.XPUB_GAP_LIMIT - 1
+            ) - available)
+        if wallet_addresses:
+            await wallet_address_pool.add_wallet_addresses(
+                db, wallet_addresses)
+        return len(wallet_addresses)
+    api_wrapper = daemon_api_wrapper_manager.api_wrappers[currency_name]
+    wallet_addresses = []
+    for _ in range(settings.WALLET_ADDRESS_POOL_SIZE - available):
+        wallet_address = await api_wrapper.get_new_address()
+        if not wallet_address:
+            logger.warning(
+                f"Wallet address creation failed for {currency_name}")
+            break
+        wallet_addresses.append(
+            WalletAddressPoolDB(
+                currency_name=currency_name,
+                wallet_address=wallet_address
+                if currency_name != 'monero' else wallet_address['address'],
+                monero_account_index=None
+                if currency_name != 'monero'
+                else wallet_address['account_index'],
+                monero_address_index=None
+                if currency_name != 'monero'
+                else wallet_address['address_index']
+            )
+        )
+    if wallet_addresses:
+        await wallet_address_pool.add_wallet_addresses(db, wallet_addresses)
+    return len(wallet_addresses)
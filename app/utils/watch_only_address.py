@@ -0,0 +1,46 @@
+import logging
+from typing import Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.config import settings
+from app.crud.address_derivation import (
+    claim_derivation_index, get_next_derivation_index)
+from app.utils.daemon_api_wrapper import daemon_api_wrapper_manager
+from app.utils.hd_wallet import derive_address
+
+logger = logging.getLogger(settings.LOGGER_NAME)
+
+# Times a caller derives again after losing the next index to another one
+MAX_DERIVATION_ATTEMPTS = 5
+
+
+def get_extended_public_key(currency_name: str) -> Optional[str]:
+    return getattr(settings, f'{currency_name.upper()}_XPUB', None)
+
+
+async def create_watch_only_address(
+        db: AsyncIOMotorDatabase, currency_name: str) -> Optional[str]:
+    """
+        Derives the address at the next index of the currency's extended
+        public key and imports it to the wallet as watch only. The index
+        only moves on once the import succeeded, so a failed import leaves
+        no unused index behind that would widen the gap xpub recovery
+        has to scan
+    """
+    api_wrapper = daemon_api_wrapper_manager.api_wrappers[currency_name]
+    extended_key = get_extended_public_key(currency_name)
+    for _ in range(MAX_DERIVATION_ATTEMPTS):
+        index = await get_next_derivation_index(db, currency_name)
+        wallet_address = derive_address(currency_name, extended_key, index)
+        # The import does not rescan, the wallet only sees funds sent to
+        # the address after it is imported. Importing an address twice is
+        # harmless, so losing the index below wastes nothing
+        if not await api_wrapper.import_watch_only_address(wallet_address):
+            logger.warning(
+                f"Watch only import failed for {currency_name} address "
+                f"{wallet_address}")
+            return None
+        if await claim_derivation_index(db, currency_name, index):
+            return wallet_address
+    return None
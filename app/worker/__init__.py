@@ -1,5 +1,5 @@
 import sentry_sdk
-from arq import create_pool, cron
+from arq import create_pool, cron, func
 from arq.connections import RedisSettings
 
 from app.core.config import settings
@@ -7,15 +7,19 @@ from app.worker.tasks import auth, payment, payout
 from app.redis import redis_manager
 from app.db import mongo_manager
 from app.db import get_default_database
+from app.db.indexes import create_indexes
 from app.utils.daemon_api_wrapper import daemon_api_wrapper_manager
+from app.utils.daemon_api_wrapper.http_client import create_http_client
 
 
 async def startup(ctx):
     await mongo_manager.connect_to_database()
     await redis_manager.connect_to_redis()
-    daemon_api_wrapper_manager.initialize_api_wrappers()
+    await daemon_api_wrapper_manager.initialize_api_wrappers()
     ctx['db'] = await get_default_database()
+    await create_indexes(ctx['db'])
     ctx['redis_client'] = redis_manager.redis_client
+    ctx['http_client'] = create_http_client(timeout=settings.WEBHOOK_TIMEOUT)
     if settings.SITE_TYPE != 'local':
         sentry_sdk.init(dsn=settings.SENTRY_DSN, traces_sample_rate=0.1)
 
@@ -23,6 +27,8 @@ async def startup(ctx):
 async def shutdown(ctx):
     await mongo_manager.disconnect_from_database()
     await redis_manager.disconnect_from_redis()
+    await daemon_api_wrapper_manager.close_api_wrappers()
+    await ctx['http_client'].aclose()
 
 
 class ARQManager(object):
@@ -42,6 +48,7 @@ class WorkerSettings:
         auth.task_send_two_factor_email,
         auth.task_send_two_factor_recovery_code_regeneration_email,
         payment.task_send_payment_data_to_webhook,
+        func(payment.task_refill_wallet_address_pool, keep_result=0),
         payout.task_create_clients_payout_queue,
         payout.task_add_payment_to_payout_queue
     ]
@@ -51,6 +58,17 @@ class WorkerSettings:
             minute=set(i for i in range(0, 60) if i % 5 == 0),
             run_at_startup=True
         ),
+        cron(
+            payment.task_watch_pending_payments,
+            second=set(
+                i for i in range(0, 60)
+                if i % settings.PAYMENT_WATCHER_INTERVAL == 0),
+            run_at_startup=True
+        ),
+        cron(
+            payment.task_refill_wallet_address_pools,
+            run_at_startup=True
+        ),
         cron(
             payout.task_clear_payout_queue,
             minute={0, 30}
@@ -1,37 +1,21 @@
-import requests
-from requests.exceptions import ConnectionError
+import httpx
+from arq import Retry
 from bson import ObjectId
 
-import simplejson as json
-
 from app.core.config import settings
 from app.models.payments import Payment
+from app.redis.lock import redis_lock
+from app.utils.currency_price_sync import sync_currency_prices
+from app.utils.daemon_api_wrapper import daemon_api_wrapper_manager
+from app.utils.payment_watcher import (
+    redispatch_payment_jobs, watch_pending_payments)
+from app.utils.wallet_address_pool import refill_wallet_address_pool
 
 # TODO: send email after a payout is done
 
 
 async def task_sync_currency_price(ctx):
-    data = {}
-    for currency in settings.ALLOWED_CURRENCY_NAME:
-        try:
-            if currency == 'baza':
-                res = requests.get(
-                    'https://www.southxchange.com/api/price/BAZA/TUSD')
-                if res.status_code == 200:
-                    data[currency] = {'usd': res.json()['Last']}
-                else:
-                    data[currency] = {}
-            else:
-                res = requests.get(
-                    'https://api.coingecko.com/api/v3/simple/'
-                    f'price?ids={currency}&vs_currencies=usd')
-                if res.status_code == 200:
-                    data[currency] = res.json().get(currency, {})
-                else:
-                    data[currency] = {}
-        except ConnectionError:
-            data[currency] = {}
-    await ctx['redis_client'].set('currency_price', json.dumps(data))
+    await sync_currency_prices(ctx['redis_client'])
 
 
 async def task_send_payment_data_to_webhook(
@@ -40,14 +24,42 @@ async def task_send_payment_data_to_webhook(
     project = await ctx['db'].projects.find_one(
         {'id': payment['related_project_id']})
     if project['webhook_url']:
-        requests.post(
-            project['webhook_url'],
-            data=Payment(
-                **payment,
-                signature=signature,
-                created_on=ObjectId(payment['_id']).generation_time
-            ).json(),
-            headers={
-                'Content-Type': 'application/json'
-            }
-        )
+        try:
+            response = await ctx['http_client'].post(
+                project['webhook_url'],
+                content=Payment(
+                    **payment,
+                    signature=signature,
+                    created_on=ObjectId(payment['_id']).generation_time
+                ).json(),
+                headers={
+                    'Content-Type': 'application/json'
+                }
+            )
+        except httpx.HTTPError:
+            raise Retry(defer=ctx['job_try'] * 10)
+        if response.status_code >= 500:
+            raise Retry(defer=ctx['job_try'] * 10)
+
+
+async def task_refill_wallet_address_pool(ctx, currency_name: str):
+    return await refill_wallet_address_pool(
+        ctx['db'], ctx['redis_client'], currency_name)
+
+
+async def task_refill_wallet_address_pools(ctx):
+    for currency_name in daemon_api_wrapper_manager.api_wrappers:
+        await refill_wallet_address_pool(
+            ctx['db'], ctx['redis_client'], currency_name)
+
+
+async def task_watch_pending_payments(ctx):
+    async with redis_lock(
+            ctx['redis_client'], 'payment_watcher_lock',
+            settings.PAYMENT_WATCHER_LOCK_TIMEOUT) as lock_acquired:
+        if not lock_acquired:
+            return
+        await redispatch_payment_jobs(ctx['db'], ctx['redis'])
+        for currency_name in daemon_api_wrapper_manager.api_wrappers:
+            await watch_pending_payments(
+                ctx['db'], ctx['redis'], currency_name)
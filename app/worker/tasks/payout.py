@@ -31,7 +31,7 @@ async def task_add_payment_to_payout_queue(ctx, payment_id: str):
     if payout_queue:
         await ctx['db'].payout_queues.update_one(
             {'_id': payout_queue['_id']},
-            {'$push': {'queues': payment['payment_id']}}
+            {'$addToSet': {'queues': payment['payment_id']}}
         )
 
 
@@ -68,21 +68,21 @@ async def task_clear_payout_queue(ctx):
                 payout_queue['for_currency']]
             if payout_queue['for_currency'] == 'bitcoin'\
                     or payout_queue['for_currency'] == 'dogecoin':
-                txid = api_wrapper.send_to_address(
+                txid = await api_wrapper.send_to_address(
                     payout_address['payout_address'], total_payout_amount)
             if payout_queue['for_currency'] == 'monero':
-                tx_data = api_wrapper.send_to_address(
+                tx_data = await api_wrapper.send_to_address(
                     payout_address['payout_address'],
                     to_atomic(total_payout_amount))
                 txid = tx_data['tx_hash'] if tx_data else None
             if payout_queue['for_currency'] == 'baza':
-                tx_data = api_wrapper.send_to_address(
+                tx_data = await api_wrapper.send_to_address(
                     payout_address['payout_address'],
                     baza_to_atomic(total_payout_amount)
                 )
                 txid = tx_data['transactionHash'] if tx_data else None
             if txid:
-                raw_tx_data = api_wrapper.get_transaction_by_id(txid)
+                raw_tx_data = await api_wrapper.get_transaction_by_id(txid)
                 payout_processed_for_payments = [
                     payment['payment_id'] for payment in payments]
                 await ctx['db'].payout_queues.update_one(